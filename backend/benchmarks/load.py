@@ -0,0 +1,334 @@
+"""Endpoint load and latency benchmark: the server.py app in-process under a concurrent mixed workload.
+
+Requests go through the full ASGI stack (routing, auth, handlers, serialization) via httpx's
+ASGITransport, against a local MongoDB (MONGO_URL) or, with --mongomock, the in-memory
+mongomock-motor stand-in. The benchmark database is dropped before seeding and after the run.
+The outbox worker and deadline scheduler run as they would in production; notifications are
+dropped unless NOTIFICATION_SINKS is set.
+
+Output is JSON with per-endpoint p50/p95/p99 latency and req/s, for comparing runs.
+
+Run from the backend directory:
+    python -m benchmarks.load --requests 2000 --concurrency 16
+    python -m benchmarks.load --mongomock --mix list_tasks=10,dashboard=5,submit=3,approve=3,login=1
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import time
+from collections import deque
+from datetime import timedelta
+from typing import Dict, List
+
+BENCHMARK_PASSWORD = "benchmark"
+DEFAULT_MIX = "login=1,list_tasks=10,dashboard=5,submit=3,approve=3"
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    unknown = [name for name in weights if name not in OPERATIONS]
+    if unknown:
+        raise SystemExit(f"Unknown operations in --mix: {', '.join(unknown)} (known: {', '.join(OPERATIONS)})")
+    return weights
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+class Workload:
+    """Seeded users and tasks, plus the pools that keep submit/approve requests valid"""
+
+    def __init__(self, server, args):
+        self.server = server
+        self.args = args
+        self.users: List[dict] = []
+        self.tokens: Dict[str, str] = {}
+        self.submittable: deque = deque()  # (task_id, assignee_id)
+        self.approvable: deque = deque()  # (task_id, approver_id)
+        self.approver_of: Dict[str, str] = {}
+        self.content = b"x" * args.submission_bytes
+
+    def headers(self, user_id: str) -> dict:
+        return {"Authorization": f"Bearer {self.tokens[user_id]}"}
+
+    def random_user(self) -> dict:
+        return random.choice(self.users)
+
+    async def seed(self) -> dict:
+        server, args = self.server, self.args
+        start = time.perf_counter()
+        password_hash = server.get_password_hash(BENCHMARK_PASSWORD)
+
+        roles = ([server.UserRole.ADMIN] + [server.UserRole.ASSIGNEE] * args.assignees
+                 + [server.UserRole.APPROVER] * args.approvers)
+        for index, role in enumerate(roles):
+            user = server.User(email=f"{role.value}{index}@benchmark.local", name=f"{role.value} {index}",
+                               password_hash=password_hash, role=role)
+            self.users.append(user.dict())
+        await server.db.users.insert_many([dict(user) for user in self.users])
+        for user in self.users:
+            self.tokens[user["id"]] = server.create_access_token({"sub": user["id"]}, timedelta(hours=2))
+
+        admin = self.users[0]
+        assignees = [user for user in self.users if user["role"] == server.UserRole.ASSIGNEE]
+        approvers = [user for user in self.users if user["role"] == server.UserRole.APPROVER]
+
+        tasks, submitted = [], []
+        for workflow_index in range(args.workflows):
+            workflow = server.Workflow(name=f"Workflow {workflow_index}", description="Benchmark workflow",
+                                       created_by=admin["id"])
+            await server.db.workflows.insert_one(workflow.dict())
+            workflow_tasks = [
+                server.Task(
+                    title=f"Task {workflow_index}.{index}",
+                    description="Benchmark task",
+                    assignee_id=assignees[(workflow_index + index) % len(assignees)]["id"],
+                    approver_id=approvers[(workflow_index + index) % len(approvers)]["id"],
+                    workflow_id=workflow.id
+                )
+                for index in range(args.tasks_per_workflow)
+            ]
+            # Approving a task triggers the next --fanout tasks in its workflow. --submitted-fraction of the
+            # tasks start out submitted, spread evenly; half of the rest are in progress
+            open_tasks = 0
+            for index, task in enumerate(workflow_tasks):
+                targets = [target.id for target in workflow_tasks[index + 1:index + 1 + args.fanout]]
+                if targets:
+                    task.transitions = [server.TaskTransition(transition_type="approved", target_task_ids=targets)]
+                if int((index + 1) * args.submitted_fraction) > int(index * args.submitted_fraction):
+                    task.status = server.TaskStatus.SUBMITTED
+                    submitted.append(task)
+                else:
+                    if open_tasks % 2 == 1:
+                        task.status = server.TaskStatus.IN_PROGRESS
+                    open_tasks += 1
+            tasks.extend(workflow_tasks)
+
+        for offset in range(0, len(tasks), 1000):
+            await server.db.tasks.insert_many([task.dict() for task in tasks[offset:offset + 1000]])
+        for task in submitted:
+            submission = server.TaskSubmission(task_id=task.id, assignee_id=task.assignee_id)
+            submission.size = await server.store_submission_content(submission.id, server.bytes_stream(self.content))
+            await server.db.task_submissions.insert_one(submission.dict())
+        await server.rebuild_task_counters()
+
+        for task in tasks:
+            self.approver_of[task.id] = task.approver_id
+            if task.status == server.TaskStatus.SUBMITTED:
+                self.approvable.append((task.id, task.approver_id))
+            else:
+                self.submittable.append((task.id, task.assignee_id))
+        random.shuffle(self.submittable)
+        random.shuffle(self.approvable)
+
+        return {
+            "users": len(self.users),
+            "workflows": args.workflows,
+            "tasks": len(tasks),
+            "submissions": len(submitted),
+            "seconds": round(time.perf_counter() - start, 3)
+        }
+
+
+async def op_login(client, workload: Workload):
+    user = workload.random_user()
+    return await client.post("/api/auth/login", json={"email": user["email"], "password": BENCHMARK_PASSWORD})
+
+
+async def op_list_tasks(client, workload: Workload):
+    user = workload.random_user()
+    return await client.get("/api/tasks", params={"limit": workload.args.page_size}, headers=workload.headers(user["id"]))
+
+
+async def op_dashboard(client, workload: Workload):
+    user = workload.random_user()
+    return await client.get("/api/dashboard", headers=workload.headers(user["id"]))
+
+
+async def op_submit(client, workload: Workload):
+    if not workload.submittable:
+        return None
+    task_id, assignee_id = workload.submittable.popleft()
+    response = await client.post(
+        f"/api/tasks/{task_id}/submit/upload", content=workload.content,
+        headers={**workload.headers(assignee_id), "Content-Type": "application/octet-stream"}
+    )
+    if response.status_code == 200:
+        workload.approvable.append((task_id, workload.approver_of[task_id]))
+    return response
+
+
+async def op_approve(client, workload: Workload):
+    if not workload.approvable:
+        return None
+    task_id, approver_id = workload.approvable.popleft()
+    # A 409 here is real contention: another approval's fan-out reopened the task before this decision
+    return await client.post(
+        f"/api/tasks/{task_id}/approve", json={"decision": "approved", "comments": "Benchmark approval"},
+        headers=workload.headers(approver_id)
+    )
+
+
+OPERATIONS = {
+    "login": ("POST /api/auth/login", op_login),
+    "list_tasks": ("GET /api/tasks", op_list_tasks),
+    "dashboard": ("GET /api/dashboard", op_dashboard),
+    "submit": ("POST /api/tasks/{task_id}/submit/upload", op_submit),
+    "approve": ("POST /api/tasks/{task_id}/approve", op_approve),
+}
+
+
+async def drive(client, workload: Workload, weights: Dict[str, float], total_requests: int, concurrency: int):
+    names, cumulative = list(weights), list(weights.values())
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    statuses: Dict[str, Dict[str, int]] = {name: {} for name in names}
+    skipped: Dict[str, int] = {name: 0 for name in names}
+    remaining = [total_requests]
+
+    async def worker():
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            name = random.choices(names, weights=cumulative)[0]
+            start = time.perf_counter()
+            response = await OPERATIONS[name][1](client, workload)
+            elapsed = time.perf_counter() - start
+            if response is None:
+                # Pool exhausted (e.g. nothing left to approve) - don't count it as a request
+                skipped[name] += 1
+                continue
+            latencies[name].append(elapsed)
+            code = str(response.status_code)
+            statuses[name][code] = statuses[name].get(code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall_seconds = time.perf_counter() - start
+
+    endpoints = {}
+    for name in names:
+        values = sorted(latencies[name])
+        endpoints[OPERATIONS[name][0]] = {
+            "requests": len(values),
+            "errors": sum(count for code, count in statuses[name].items() if not code.startswith("2")),
+            "statuses": statuses[name],
+            "skipped": skipped[name],
+            "p50_ms": round(percentile(values, 50) * 1000, 3),
+            "p95_ms": round(percentile(values, 95) * 1000, 3),
+            "p99_ms": round(percentile(values, 99) * 1000, 3),
+            "req_per_s": round(len(values) / wall_seconds, 2) if wall_seconds else None
+        }
+
+    all_values = sorted(value for values in latencies.values() for value in values)
+    overall = {
+        "requests": len(all_values),
+        "seconds": round(wall_seconds, 3),
+        "p50_ms": round(percentile(all_values, 50) * 1000, 3),
+        "p95_ms": round(percentile(all_values, 95) * 1000, 3),
+        "p99_ms": round(percentile(all_values, 99) * 1000, 3),
+        "req_per_s": round(len(all_values) / wall_seconds, 2) if wall_seconds else None
+    }
+    return endpoints, overall
+
+
+async def run(args) -> dict:
+    # server reads its configuration at import time
+    os.environ["DB_NAME"] = args.db_name
+    if args.mongo_url:
+        os.environ["MONGO_URL"] = args.mongo_url
+    os.environ.setdefault("NOTIFICATION_SINKS", "")
+    import httpx
+    import server
+    # One INFO line per request would dominate the run
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    if args.mongomock:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            raise SystemExit("--mongomock needs the mongomock-motor package: pip install mongomock-motor")
+        server.client = AsyncMongoMockClient()
+        server.db = server.client[args.db_name]
+
+    random.seed(args.seed)
+    await server.client.drop_database(args.db_name)
+    await server.app.router.startup()
+    try:
+        workload = Workload(server, args)
+        seeded = await workload.seed()
+
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            endpoints, overall = await drive(client, workload, parse_mix(args.mix), args.requests, args.concurrency)
+
+        # Let queued transitions finish so their cost isn't carried into the next run
+        drained = await server.transition_worker.drain()
+    finally:
+        if not args.keep_data:
+            await server.client.drop_database(args.db_name)
+        await server.app.router.shutdown()
+
+    return {
+        "config": {
+            "store": "mongomock" if args.mongomock else "mongodb",
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "mix": args.mix,
+            "page_size": args.page_size,
+            "fanout": args.fanout,
+            "submitted_fraction": args.submitted_fraction,
+            "submission_bytes": args.submission_bytes,
+            "seed": args.seed
+        },
+        "seeded": seeded,
+        "overall": overall,
+        "endpoints": endpoints,
+        "transition_jobs_drained_after_run": drained
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mongomock", action="store_true", help="use the in-memory mongomock-motor stand-in")
+    parser.add_argument("--mongo-url", help="MongoDB to run against (default: MONGO_URL)")
+    parser.add_argument("--db-name", default="workflow_benchmark", help="database to seed - dropped before and after the run")
+    parser.add_argument("--keep-data", action="store_true", help="keep the seeded database after the run")
+    parser.add_argument("--assignees", type=int, default=20)
+    parser.add_argument("--approvers", type=int, default=10)
+    parser.add_argument("--workflows", type=int, default=20)
+    parser.add_argument("--tasks-per-workflow", type=int, default=50)
+    parser.add_argument("--fanout", type=int, default=3, help="tasks triggered by each approval")
+    parser.add_argument("--submitted-fraction", type=float, default=1 / 3,
+                        help="share of seeded tasks that start out submitted, i.e. the initial approve pool")
+    parser.add_argument("--submission-bytes", type=int, default=4096)
+    parser.add_argument("--page-size", type=int, default=100, help="limit for task list requests")
+    parser.add_argument("--requests", type=int, default=2000, help="total requests across all workers")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="operation weights, e.g. list_tasks=10,approve=3")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for operation and user choice")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args(argv)
+    parse_mix(args.mix)
+    if not 0 <= args.submitted_fraction <= 1:
+        parser.error("--submitted-fraction must be between 0 and 1")
+
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
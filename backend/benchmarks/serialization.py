@@ -0,0 +1,128 @@
+"""Per-endpoint CPU cost of response serialization, before and after the orjson fast path.
+
+"before" builds models and lets FastAPI re-validate them against response_model and encode
+with the stdlib JSON encoder; "after" is what the list/detail handlers do now: validate once,
+model_dump and encode with orjson.
+
+Run from the backend directory: python -m benchmarks.serialization --items 100
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from server import Comment, Task, TaskSubmission, UserPublic, Workflow
+
+
+def task_doc(workflow_id: str, index: int) -> dict:
+    now = datetime.utcnow()
+    return {
+        "id": str(uuid.uuid4()),
+        "title": f"Task {index}",
+        "description": "Review the quarterly report and attach the signed copy. " * 4,
+        "deadline": now + timedelta(days=7),
+        "assignee_id": str(uuid.uuid4()),
+        "approver_id": str(uuid.uuid4()),
+        "workflow_id": workflow_id,
+        "status": "in_progress",
+        "transitions": [
+            {"id": str(uuid.uuid4()), "transition_type": "approved", "target_task_ids": [str(uuid.uuid4())], "is_automatic": True},
+            {"id": str(uuid.uuid4()), "transition_type": "rejected", "target_task_ids": [str(uuid.uuid4())], "is_automatic": True}
+        ],
+        "created_at": now,
+        "updated_at": now
+    }
+
+
+def build_payloads(items: int) -> dict:
+    now = datetime.utcnow()
+    workflow_id = str(uuid.uuid4())
+    tasks = [task_doc(workflow_id, index) for index in range(items)]
+    workflow = {
+        "id": workflow_id, "name": "Quarterly close", "description": "Close the books",
+        "tasks": tasks, "created_by": str(uuid.uuid4()), "created_at": now, "is_active": True
+    }
+    return {
+        "GET /api/tasks": (List[Task], Task, tasks),
+        "GET /api/tasks/{task_id}": (Task, Task, tasks[0]),
+        "GET /api/workflows": (List[Workflow], Workflow, [dict(workflow, tasks=[]) for _ in range(items)]),
+        "GET /api/workflows/{workflow_id}": (Workflow, Workflow, workflow),
+        "GET /api/tasks/{task_id}/submissions": (List[TaskSubmission], TaskSubmission, [
+            {"id": str(uuid.uuid4()), "task_id": workflow_id, "assignee_id": workflow_id,
+             "content": "Done. " * 40, "submitted_at": now, "status": "submitted"}
+            for _ in range(items)
+        ]),
+        "GET /api/tasks/{task_id}/comments": (List[Comment], Comment, [
+            {"id": str(uuid.uuid4()), "task_id": workflow_id, "user_id": workflow_id,
+             "content": "Looks good to me", "created_at": now}
+            for _ in range(items)
+        ]),
+        "GET /api/users": (List[UserPublic], UserPublic, [
+            {"id": str(uuid.uuid4()), "email": f"user{index}@example.com", "name": f"User {index}",
+             "role": "assignee", "created_at": now}
+            for index in range(items)
+        ])
+    }
+
+
+def validate(model, docs):
+    if isinstance(docs, list):
+        return [model(**doc) for doc in docs]
+    return model(**docs)
+
+
+async def before(response_field, model, docs) -> bytes:
+    content = await serialize_response(field=response_field, response_content=validate(model, docs))
+    return JSONResponse(content).body
+
+
+async def after(response_field, model, docs) -> bytes:
+    models = validate(model, docs)
+    content = [item.model_dump() for item in models] if isinstance(models, list) else models.model_dump()
+    return ORJSONResponse(content).body
+
+
+async def cpu_per_call(func, args, repeat: int) -> float:
+    start = time.process_time()
+    for _ in range(repeat):
+        await func(*args)
+    return (time.process_time() - start) / repeat
+
+
+async def run(items: int, repeat: int) -> dict:
+    results = {}
+    for endpoint, (response_type, model, docs) in build_payloads(items).items():
+        response_field = create_response_field(name="response", type_=response_type, mode="serialization")
+        call_args = (response_field, model, docs)
+        if json.loads(await before(*call_args)) != json.loads(await after(*call_args)):
+            raise SystemExit(f"{endpoint}: fast path output differs")
+
+        before_ms = await cpu_per_call(before, call_args, repeat) * 1000
+        after_ms = await cpu_per_call(after, call_args, repeat) * 1000
+        results[endpoint] = {
+            "before_cpu_ms": round(before_ms, 3),
+            "after_cpu_ms": round(after_ms, 3),
+            "speedup": round(before_ms / after_ms, 2) if after_ms else None
+        }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100, help="documents per list response")
+    parser.add_argument("--repeat", type=int, default=50, help="calls measured per endpoint and path")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args.items, args.repeat))
+    print(json.dumps({"items": args.items, "repeat": args.repeat, "endpoints": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
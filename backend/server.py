@@ -1,15 +1,34 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, IndexModel, InsertOne, ReplaceOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from bson import ObjectId
 import os
+import sys
+import asyncio
+import argparse
+import heapq
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+import smtplib
+import urllib.parse
+import urllib.request
+from email.message import EmailMessage
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 import uuid
-from datetime import datetime, timedelta
+import base64
+import json
+import hashlib
+from email.utils import format_datetime, parsedate_to_datetime
+from datetime import datetime, timedelta, timezone
 import jwt
 from passlib.context import CryptContext
 from enum import Enum
@@ -27,11 +46,78 @@ SECRET_KEY = "your-secret-key-here"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Bulk import and batch endpoints
+MAX_IMPORT_TASKS = int(os.environ.get('MAX_IMPORT_TASKS', 2000))
+MAX_BATCH_ITEMS = int(os.environ.get('MAX_BATCH_ITEMS', 5000))
+# Guarded write rounds for a status batch before items still racing other writers get 409
+STATUS_BATCH_MAX_ROUNDS = 3
+
+# Submission content - stored out-of-line in fixed-size chunks (GridFS' default chunk size)
+SUBMISSION_CHUNK_SIZE = int(os.environ.get('SUBMISSION_CHUNK_SIZE', 255 * 1024))
+SUBMISSION_MAX_BYTES = int(os.environ.get('SUBMISSION_MAX_BYTES', 100 * 1024 * 1024))
+
+# Pagination
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Principal cache
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.environ.get('PRINCIPAL_CACHE_TTL_SECONDS', 60))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.environ.get('PRINCIPAL_CACHE_MAX_SIZE', 10000))
+
+# Password hashing pool
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 4))
+PASSWORD_HASH_QUEUE_LIMIT = int(os.environ.get('PASSWORD_HASH_QUEUE_LIMIT', 64))
+
+# Task event stream
+EVENT_STREAM_BUFFER_SIZE = int(os.environ.get('EVENT_STREAM_BUFFER_SIZE', 256))
+EVENT_HISTORY_SIZE = int(os.environ.get('EVENT_HISTORY_SIZE', 10000))
+EVENT_STREAM_HEARTBEAT_SECONDS = float(os.environ.get('EVENT_STREAM_HEARTBEAT_SECONDS', 15))
+# Stream events are relayed from db.task_events, so every app process sees writes made by any other
+EVENT_RELAY_POLL_SECONDS = float(os.environ.get('EVENT_RELAY_POLL_SECONDS', 0.5))
+
+# Task history tail - event ids are generated by each app process, so only ids older than the settle
+# window are served; by then every writer (and its transaction) holding an earlier id has committed
+TASK_EVENT_SETTLE_SECONDS = float(os.environ.get('TASK_EVENT_SETTLE_SECONDS', 5))
+
+# Transition graph limits per approval - 1 hop keeps the original single-step behaviour
+TRANSITION_MAX_HOPS = int(os.environ.get('TRANSITION_MAX_HOPS', 1))
+TRANSITION_MAX_FANOUT = int(os.environ.get('TRANSITION_MAX_FANOUT', 1000))
+
+# Compiled transition graph cache - edits are detected through workflows.graph_version; the TTL
+# only lets idle workflows age out
+TRANSITION_GRAPH_CACHE_TTL_SECONDS = float(os.environ.get('TRANSITION_GRAPH_CACHE_TTL_SECONDS', 60))
+TRANSITION_GRAPH_CACHE_MAX_WORKFLOWS = int(os.environ.get('TRANSITION_GRAPH_CACHE_MAX_WORKFLOWS', 1000))
+
+# Notifications
+NOTIFICATION_SINKS = [sink.strip() for sink in os.environ.get('NOTIFICATION_SINKS', 'log').split(',') if sink.strip()]
+NOTIFICATION_LOG_FILE = os.environ.get('NOTIFICATION_LOG_FILE', str(ROOT_DIR / 'notifications.log'))
+NOTIFICATION_SMTP_HOST = os.environ.get('NOTIFICATION_SMTP_HOST', 'localhost')
+NOTIFICATION_SMTP_PORT = int(os.environ.get('NOTIFICATION_SMTP_PORT', 1025))
+NOTIFICATION_SMTP_SENDER = os.environ.get('NOTIFICATION_SMTP_SENDER', 'workflow@localhost')
+NOTIFICATION_WEBHOOK_URL = os.environ.get('NOTIFICATION_WEBHOOK_URL', 'http://localhost:8080/notifications')
+NOTIFICATION_BATCH_WINDOW_SECONDS = float(os.environ.get('NOTIFICATION_BATCH_WINDOW_SECONDS', 2))
+NOTIFICATION_MAX_BATCH_SIZE = int(os.environ.get('NOTIFICATION_MAX_BATCH_SIZE', 500))
+NOTIFICATION_QUEUE_LIMIT = int(os.environ.get('NOTIFICATION_QUEUE_LIMIT', 10000))
+
+# Transition outbox worker
+OUTBOX_WORKER_ENABLED = os.environ.get('OUTBOX_WORKER_ENABLED', 'true').lower() == 'true'
+OUTBOX_POLL_INTERVAL_SECONDS = float(os.environ.get('OUTBOX_POLL_INTERVAL_SECONDS', 1))
+OUTBOX_LEASE_SECONDS = float(os.environ.get('OUTBOX_LEASE_SECONDS', 60))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', 5))
+
+# Deadline scheduler - safe in every process: each firing is claimed on its task before it is sent
+DEADLINE_SCHEDULER_ENABLED = os.environ.get('DEADLINE_SCHEDULER_ENABLED', 'true').lower() == 'true'
+DEADLINE_REMINDER_SECONDS = float(os.environ.get('DEADLINE_REMINDER_SECONDS', 24 * 3600))
+# How far ahead deadlines are loaded into memory; later ones are picked up as the window slides
+DEADLINE_WINDOW_SECONDS = float(os.environ.get('DEADLINE_WINDOW_SECONDS', 3600))
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -53,6 +139,10 @@ class TransitionType(str, Enum):
     APPROVED = "approved"
     REJECTED = "rejected"
 
+class ListView(str, Enum):
+    SUMMARY = "summary"
+    FULL = "full"
+
 # Models
 class User(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -62,6 +152,13 @@ class User(BaseModel):
     role: UserRole
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+class UserPublic(BaseModel):
+    id: str
+    email: str
+    name: str
+    role: UserRole
+    created_at: datetime
+
 class UserCreate(BaseModel):
     email: str
     name: str
@@ -93,9 +190,26 @@ class Task(BaseModel):
     workflow_id: str
     status: TaskStatus = TaskStatus.NOT_STARTED
     transitions: List[TaskTransition] = []
+    comment_count: int = 0
+    last_comment_at: Optional[datetime] = None
+    version: int = 0
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+class TaskSummary(BaseModel):
+    id: str
+    title: str
+    status: TaskStatus
+    deadline: Optional[datetime] = None
+    assignee_id: str
+    approver_id: str
+    workflow_id: str
+    comment_count: int = 0
+    last_comment_at: Optional[datetime] = None
+    version: int = 0
+    created_at: datetime
+    updated_at: datetime
+
 class Workflow(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
@@ -106,10 +220,13 @@ class Workflow(BaseModel):
     is_active: bool = True
 
 class TaskSubmission(BaseModel):
+    """Submission metadata - the content lives in db.submission_chunks and is fetched via /content"""
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     task_id: str
     assignee_id: str
-    content: str
+    filename: Optional[str] = None
+    content_type: str = "text/plain; charset=utf-8"
+    size: Optional[int] = None  # unknown for submissions stored inline before chunked storage
     submitted_at: datetime = Field(default_factory=datetime.utcnow)
     status: TaskStatus = TaskStatus.SUBMITTED
 
@@ -129,6 +246,19 @@ class Comment(BaseModel):
     content: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+class TaskEvent(BaseModel):
+    """One entry of the append-only task history; ids are ObjectIds so they sort by time"""
+    id: str
+    task_id: str
+    workflow_id: str
+    type: str = "task_status"
+    previous_status: Optional[TaskStatus] = None
+    status: TaskStatus
+    source: str
+    actor_id: Optional[str] = None
+    details: Dict[str, Any] = {}
+    created_at: datetime
+
 # Create Models
 class WorkflowCreate(BaseModel):
     name: str
@@ -142,16 +272,193 @@ class TaskCreate(BaseModel):
     approver_id: str
     transitions: List[TaskTransition] = []
 
+class TransitionImport(BaseModel):
+    transition_type: TransitionType
+    target_refs: List[str]  # refs of tasks in the same import
+    is_automatic: bool = True
+
+class TaskImport(BaseModel):
+    ref: str  # client-side reference, resolved to a task id on import
+    title: str
+    description: str
+    deadline: Optional[datetime] = None
+    assignee_id: str
+    approver_id: str
+    transitions: List[TransitionImport] = []
+
+class WorkflowImport(BaseModel):
+    name: str
+    description: str
+    tasks: List[TaskImport] = []
+
+class TaskStatusUpdate(BaseModel):
+    task_id: str
+    status: TaskStatus
+
+class BatchItemResult(BaseModel):
+    index: int
+    id: Optional[str] = None
+    status_code: int
+    error: Optional[str] = None
+
+class BatchResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BatchItemResult]
+
 class TaskSubmissionCreate(BaseModel):
     content: str
+    version: Optional[int] = None  # expected task version, 409 if the task changed since it was read
 
 class TaskApprovalCreate(BaseModel):
     decision: str
     comments: str
+    version: Optional[int] = None
 
 class CommentCreate(BaseModel):
     content: str
 
+# Database indexes - one entry per query shape the API issues
+INDEX_MANIFEST = {
+    "users": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("created_at", ASCENDING), ("id", ASCENDING)], name="created_at_id"),
+    ],
+    "workflows": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("created_at", ASCENDING), ("id", ASCENDING)], name="created_at_id"),
+    ],
+    "tasks": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # Pages a workflow's tasks; its workflow_id prefix serves the plain workflow lookups too
+        IndexModel([("workflow_id", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)], name="workflow_id_created_at_id"),
+        # Per-user GET /tasks/overdue; the (owner, status) prefix serves the plain status lookups too
+        IndexModel([("assignee_id", ASCENDING), ("status", ASCENDING), ("deadline", ASCENDING), ("id", ASCENDING)],
+                   name="assignee_id_status_deadline_id"),
+        IndexModel([("approver_id", ASCENDING), ("status", ASCENDING), ("deadline", ASCENDING), ("id", ASCENDING)],
+                   name="approver_id_status_deadline_id"),
+        # Covers the non-admin workflow lookup ($match on the user, $group on workflow_id)
+        IndexModel([("assignee_id", ASCENDING), ("workflow_id", ASCENDING)], name="assignee_id_workflow_id"),
+        IndexModel([("approver_id", ASCENDING), ("workflow_id", ASCENDING)], name="approver_id_workflow_id"),
+        IndexModel([("assignee_id", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)], name="assignee_id_created_at_id"),
+        IndexModel([("approver_id", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)], name="approver_id_created_at_id"),
+        IndexModel([("created_at", ASCENDING), ("id", ASCENDING)], name="created_at_id"),
+        # Outbox sweep for decisions whose job was never enqueued
+        IndexModel([("pending_transition.queued_at", ASCENDING)], name="pending_transition_queued_at", sparse=True),
+        # Deadline scheduler windows and GET /tasks/overdue
+        IndexModel([("status", ASCENDING), ("deadline", ASCENDING), ("id", ASCENDING)], name="status_deadline_id"),
+    ],
+    "task_submissions": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("task_id", ASCENDING), ("submitted_at", DESCENDING)], name="task_id_submitted_at"),
+    ],
+    "submission_chunks": [
+        IndexModel([("submission_id", ASCENDING), ("n", ASCENDING)], name="submission_id_n", unique=True),
+    ],
+    "task_approvals": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("task_id", ASCENDING)], name="task_id"),
+    ],
+    "transition_outbox": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("status", ASCENDING), ("available_at", ASCENDING)], name="status_available_at"),
+        # Completed jobs are kept for a week for auditing
+        IndexModel([("completed_at", ASCENDING)], name="completed_at_ttl", expireAfterSeconds=7 * 24 * 3600),
+    ],
+    "comments": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("task_id", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)], name="task_id_created_at_id"),
+    ],
+    # Append-only - keyed by ObjectId so inserts land at the right edge of the _id index and the global tail is a range on it
+    "task_events": [
+        IndexModel([("task_id", ASCENDING), ("_id", ASCENDING)], name="task_id_id"),
+    ],
+}
+
+async def ensure_indexes():
+    """Create every index in INDEX_MANIFEST - safe to run repeatedly"""
+    for collection_name, indexes in INDEX_MANIFEST.items():
+        try:
+            await db[collection_name].create_indexes(indexes)
+        except OperationFailure as e:
+            # e.g. duplicate emails blocking a unique index - keep serving, check-indexes will report it
+            logger.error(f"Failed to create indexes on {collection_name}: {e}")
+
+async def check_indexes():
+    """Report manifest indexes that are missing, unknown or never used"""
+    report = {}
+    for collection_name, indexes in INDEX_MANIFEST.items():
+        collection = db[collection_name]
+        expected = {index.document["name"] for index in indexes}
+        existing = set((await collection.index_information()).keys()) - {"_id_"}
+        
+        unused = []
+        try:
+            async for stats in collection.aggregate([{"$indexStats": {}}]):
+                if stats["name"] != "_id_" and stats["accesses"]["ops"] == 0:
+                    unused.append(stats["name"])
+        except OperationFailure:
+            # $indexStats needs clusterMonitor privileges
+            unused = None
+        
+        report[collection_name] = {
+            "missing": sorted(expected - existing),
+            "unknown": sorted(existing - expected),
+            "unused": sorted(unused) if unused is not None else None
+        }
+    
+    return report
+
+# Principal cache - avoids a users lookup on every authenticated request
+class PrincipalCache:
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, user_id: str) -> Optional[User]:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return entry[1]
+    
+    def set(self, user: User):
+        self._entries[user.id] = (time.monotonic() + self.ttl_seconds, user)
+        self._entries.move_to_end(user.id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def invalidate(self, user_id: str):
+        self._entries.pop(user_id, None)
+    
+    def clear(self):
+        self._entries.clear()
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_CACHE_MAX_SIZE)
+
 # Utility functions
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -159,6 +466,53 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+# Password hashing pool - bcrypt is CPU bound and must not block the event loop
+class PasswordHasher:
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self.pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+    
+    async def _run(self, func, *args):
+        if self.pending >= self.workers + self.queue_limit:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Too many authentication requests, please retry")
+        
+        self.pending += 1
+        self.peak_pending = max(self.peak_pending, self.pending)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+    
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+    
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+    
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+    
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "active": min(self.pending, self.workers),
+            "queued": max(self.pending - self.workers, 0),
+            "peak_pending": self.peak_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "saturation": self.pending / (self.workers + self.queue_limit)
+        }
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_LIMIT)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -169,51 +523,1342 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def authenticate_token(token: str) -> User:
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
         if user_id is None:
             raise HTTPException(status_code=401, detail="Invalid token")
         
+        cached_user = principal_cache.get(user_id)
+        if cached_user is not None:
+            return cached_user
+        
         user = await db.users.find_one({"id": user_id})
         if user is None:
             raise HTTPException(status_code=401, detail="User not found")
         
-        return User(**user)
+        user = User(**user)
+        principal_cache.set(user)
+        return user
     except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    return await authenticate_token(credentials.credentials)
+
+async def get_stream_user(
+    access_token: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
+    # Browsers' EventSource cannot set headers, so streams also accept ?access_token=
+    if credentials is not None:
+        return await authenticate_token(credentials.credentials)
+    if access_token:
+        return await authenticate_token(access_token)
+    raise HTTPException(status_code=401, detail="Not authenticated")
+
+# Pagination helpers
+def encode_cursor(sort_value: datetime, doc_id: str) -> str:
+    payload = json.dumps({"t": sort_value.isoformat(), "id": doc_id})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["t"]), payload["id"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_filter(cursor: str, sort_field: str) -> dict:
+    sort_value, last_id = decode_cursor(cursor)
+    return keyset_after(sort_field, sort_value, last_id)
+
+def keyset_after(sort_field: str, sort_value, last_id: str) -> dict:
+    """Documents strictly after (sort_value, last_id) in (sort_field, id) order"""
+    return {"$or": [
+        {sort_field: {"$gt": sort_value}},
+        {sort_field: sort_value, "id": {"$gt": last_id}}
+    ]}
+
+def page_of(docs: List[dict], response: Response, limit: int, sort_field: str) -> List[dict]:
+    """Trim the extra look-ahead document and expose the next cursor when there is one"""
+    if len(docs) > limit:
+        docs = docs[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(docs[-1][sort_field], docs[-1]["id"])
+    return docs
+
+async def paginate(collection, query: dict, response: Response, cursor: Optional[str] = None,
+                   limit: int = DEFAULT_PAGE_SIZE, sort_field: str = "created_at", projection: Optional[dict] = None):
+    """Keyset pagination on (sort_field, id) - page cost does not grow with offset"""
+    if cursor:
+        query = {"$and": [query, keyset_filter(cursor, sort_field)]}
+    
+    docs = await collection.find(query, projection).sort([(sort_field, 1), ("id", 1)]).limit(limit + 1).to_list(limit + 1)
+    return page_of(docs, response, limit, sort_field)
+
+# Projections for list views
+def task_projection(view: ListView, fields: Optional[str]):
+    """Mongo projection and response model for a task list; model is None when returning raw fields"""
+    if fields:
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in requested if field not in Task.model_fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown task fields: {', '.join(unknown)}")
+        # id and timestamps are always returned, pagination cursors and ETags are built from them
+        projection = {"_id": 0, "id": 1, "created_at": 1, "updated_at": 1}
+        projection.update({field: 1 for field in requested})
+        if "comment_count" in projection:
+            # Comments don't touch updated_at - Last-Modified needs the comment timestamp alongside the count
+            projection["last_comment_at"] = 1
+        return projection, None
+    
+    if view == ListView.SUMMARY:
+        return {"_id": 0, **{field: 1 for field in TaskSummary.model_fields}}, TaskSummary
+    
+    return {"_id": 0}, Task
+
+def serialize_tasks(tasks: List[dict], model) -> list:
+    return [model(**task).model_dump() for task in tasks] if model else tasks
+
+# Fast serialization - documents are validated once into models, dumped and encoded with orjson
+def json_response(content, response: Response) -> ORJSONResponse:
+    """Skip FastAPI's response_model re-validation; headers set on the injected response are kept"""
+    return ORJSONResponse(content, headers=dict(response.headers))
+
+# Conditional GET - ETags and Last-Modified derived from timestamps, checked before building models
+def compute_etag(*parts) -> str:
+    return '"' + hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest() + '"'
+
+def task_modified_at(task: dict) -> datetime:
+    """Last-Modified for a task - comments move it without bumping updated_at"""
+    return max(task["updated_at"], task.get("last_comment_at") or task["updated_at"])
+
+def http_date(value: datetime) -> str:
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+def conditional_response(request: Request, response: Response, etag: str,
+                         last_modified: Optional[datetime]) -> Optional[Response]:
+    """Attach validators to the response; return a 304 response when the client's copy is current"""
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    response.headers.update(headers)
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")]
+        if etag in candidates or "*" in candidates:
+            return Response(status_code=304, headers=dict(response.headers))
+        return None
+    
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return None
+        # "-0000" (and other zone-less dates) parse naive; HTTP dates are always GMT
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        if last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since:
+            return Response(status_code=304, headers=dict(response.headers))
+    
+    return None
+
+# Transactions - used for multi-document writes when the deployment is a replica set
+class Transactions:
+    def __init__(self):
+        self.supported: Optional[bool] = None
+    
+    async def detect(self) -> bool:
+        try:
+            hello = await client.admin.command("hello")
+            self.supported = "setName" in hello
+        except Exception as e:
+            logger.warning(f"Could not detect replica set, running without transactions: {e}")
+            self.supported = False
+        return self.supported
+    
+    async def run(self, operation):
+        """Run operation(session) in a transaction when supported, otherwise with session=None.
+
+        with_transaction retries the whole operation when a concurrent writer aborts it
+        (TransientTransactionError), so guarded writes re-evaluate and report a 409 instead of a 500.
+        """
+        if self.supported is None:
+            await self.detect()
+        if not self.supported:
+            return await operation(None)
+        async with await client.start_session() as session:
+            return await session.with_transaction(operation)
+
+transactions = Transactions()
+
+# Optimistic concurrency - task writes bump version; guarded writes that match nothing are classified here
+def version_filter(version: int):
+    # Tasks written before versioning have no field and read back as version 0
+    return {"$in": [0, None]} if version == 0 else version
+
+async def task_write_conflict(task_id: str, owner_field: str, user: User, detail: str) -> HTTPException:
+    task = await db.tasks.find_one({"id": task_id}, {"_id": 0, owner_field: 1})
+    if not task:
+        return HTTPException(status_code=404, detail="Task not found")
+    if task[owner_field] != user.id:
+        return HTTPException(status_code=403, detail="Not authorized")
+    return HTTPException(status_code=409, detail=detail)
+
+# Submission content - streamed in and out of db.submission_chunks so no request holds a whole deliverable
+async def bytes_stream(data: bytes):
+    yield data
+
+async def store_submission_content(submission_id: str, stream) -> int:
+    """Write an async byte stream as numbered chunks, returns the total size"""
+    size, n, buffer = 0, 0, bytearray()
+    try:
+        async for data in stream:
+            size += len(data)
+            if size > SUBMISSION_MAX_BYTES:
+                raise HTTPException(status_code=413, detail=f"Submission exceeds {SUBMISSION_MAX_BYTES} bytes")
+            buffer.extend(data)
+            while len(buffer) >= SUBMISSION_CHUNK_SIZE:
+                await db.submission_chunks.insert_one(
+                    {"submission_id": submission_id, "n": n, "data": bytes(buffer[:SUBMISSION_CHUNK_SIZE])}
+                )
+                del buffer[:SUBMISSION_CHUNK_SIZE]
+                n += 1
+        if buffer:
+            await db.submission_chunks.insert_one({"submission_id": submission_id, "n": n, "data": bytes(buffer)})
+    except BaseException:
+        # Client went away or the body was too large - don't leave orphaned chunks behind
+        await delete_submission_content(submission_id)
+        raise
+    return size
+
+async def delete_submission_content(submission_id: str):
+    await db.submission_chunks.delete_many({"submission_id": submission_id})
+
+async def iter_submission_content(submission: dict):
+    if "content" in submission:
+        yield submission["content"].encode()
+        return
+    chunks = db.submission_chunks.find({"submission_id": submission["id"]}, {"_id": 0, "data": 1}).sort("n", ASCENDING)
+    async for chunk in chunks.batch_size(4):
+        yield chunk["data"]
+
+# Materialized dashboard counters - one document per scope in db.task_counters
+GLOBAL_COUNTER_ID = "global"
+
+def task_counter_ids(task_doc: dict) -> List[str]:
+    return [
+        GLOBAL_COUNTER_ID,
+        f"workflow:{task_doc['workflow_id']}",
+        f"assignee:{task_doc['assignee_id']}",
+        f"approver:{task_doc['approver_id']}"
+    ]
+
+def status_change_ops(changes: List[tuple]) -> List[UpdateOne]:
+    """Counter updates for (task_doc, old_status, new_status) changes - old_status is None when created"""
+    increments: Dict[str, Dict[str, int]] = {}
+    for task_doc, old_status, new_status in changes:
+        old_status = TaskStatus(old_status).value if old_status is not None else None
+        new_status = TaskStatus(new_status).value
+        if old_status == new_status:
+            continue
+        
+        for counter_id in task_counter_ids(task_doc):
+            counter_increments = increments.setdefault(counter_id, {})
+            counter_increments[f"status_counts.{new_status}"] = counter_increments.get(f"status_counts.{new_status}", 0) + 1
+            if old_status is not None:
+                counter_increments[f"status_counts.{old_status}"] = counter_increments.get(f"status_counts.{old_status}", 0) - 1
+    
+    ops = []
+    for counter_id, counter_increments in increments.items():
+        counter_increments = {field: delta for field, delta in counter_increments.items() if delta}
+        if counter_increments:
+            ops.append(UpdateOne({"_id": counter_id}, {"$inc": counter_increments}, upsert=True))
+    
+    return ops
+
+async def apply_counter_ops(ops: List[UpdateOne]):
+    if ops:
+        await db.task_counters.bulk_write(ops, ordered=False)
+
+async def record_task_events(changes: List[tuple], source: str, actor_id: Optional[str] = None,
+                             details: Optional[dict] = None, session=None):
+    """Append history for (task_doc, old_status, new_status) changes, inside the caller's transaction if given"""
+    if changes:
+        await db.task_events.insert_many(task_event_docs(changes, source, actor_id, details), session=session)
+
+async def apply_status_changes(changes: List[tuple], source: str):
+    """Apply counters and reschedule deadlines once the changes are committed - the event relay streams their history"""
+    if not changes:
+        return
+    await apply_counter_ops(status_change_ops(changes))
+    deadline_scheduler.track_status_changes(changes)
+
+async def record_status_changes(changes: List[tuple], source: str, actor_id: Optional[str] = None,
+                                 details: Optional[dict] = None):
+    """Append history and apply counters for (task_doc, old_status, new_status) changes"""
+    await record_task_events(changes, source, actor_id, details)
+    await apply_status_changes(changes, source)
+
+async def record_status_change(task_doc: dict, old_status: Optional[str], new_status: str, source: str,
+                               actor_id: Optional[str] = None, details: Optional[dict] = None):
+    await record_status_changes([(task_doc, old_status, new_status)], source, actor_id, details)
+
+# Task history - append-only db.task_events, one document per status change or deadline alert
+def task_event_docs(changes: List[tuple], source: str, actor_id: Optional[str], details: Optional[dict]) -> List[dict]:
+    now = datetime.utcnow()
+    return [
+        {
+            "_id": ObjectId(),
+            "task_id": task_doc["id"],
+            "workflow_id": task_doc["workflow_id"],
+            "assignee_id": task_doc.get("assignee_id"),
+            "approver_id": task_doc.get("approver_id"),
+            "type": "task_status",
+            "previous_status": TaskStatus(old_status).value if old_status is not None else None,
+            "status": TaskStatus(new_status).value,
+            "source": source,
+            "actor_id": actor_id,
+            "details": details or {},
+            "created_at": now
+        }
+        for task_doc, old_status, new_status in changes
+    ]
+
+def deadline_event_doc(task_doc: dict, kind: str) -> dict:
+    return {
+        "_id": ObjectId(),
+        "task_id": task_doc["id"],
+        "workflow_id": task_doc["workflow_id"],
+        "assignee_id": task_doc["assignee_id"],
+        "approver_id": task_doc["approver_id"],
+        "type": f"task_{kind}",
+        "previous_status": None,
+        "status": TaskStatus(task_doc["status"]).value,
+        "source": "deadline",
+        "actor_id": None,
+        "details": {"deadline": task_doc["deadline"]},
+        "created_at": datetime.utcnow()
+    }
+
+async def task_events_page(query: dict, response: Response, after: Optional[str], limit: int,
+                           settled_before: Optional[ObjectId] = None) -> List[dict]:
+    """Range scan on _id after the given event id; the next cursor is simply the last event id"""
+    id_range = {}
+    if after:
+        if not ObjectId.is_valid(after):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        id_range["$gt"] = ObjectId(after)
+    if settled_before is not None:
+        id_range["$lt"] = settled_before
+    if id_range:
+        query = {**query, "_id": id_range}
+    
+    events = await db.task_events.find(query).sort("_id", ASCENDING).limit(limit + 1).to_list(limit + 1)
+    if len(events) > limit:
+        events = events[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = str(events[-1]["_id"])
+    return [TaskEvent(id=str(event.pop("_id")), **event).model_dump() for event in events]
+
+def counter_status_counts(counter: Optional[dict]) -> Dict[str, int]:
+    stored_counts = (counter or {}).get("status_counts", {})
+    return {task_status.value: stored_counts.get(task_status.value, 0) for task_status in TaskStatus}
+
+async def rebuild_task_counters():
+    """Recompute every counter document from db.tasks to repair drift"""
+    def group_by(key: Optional[str]):
+        return [{"$group": {"_id": {"owner": f"${key}" if key else None, "status": "$status"}, "count": {"$sum": 1}}}]
+    
+    pipeline = [{"$facet": {
+        "global": group_by(None),
+        "workflow": group_by("workflow_id"),
+        "assignee": group_by("assignee_id"),
+        "approver": group_by("approver_id")
+    }}]
+    
+    counters: Dict[str, dict] = {GLOBAL_COUNTER_ID: {"_id": GLOBAL_COUNTER_ID, "status_counts": {}}}
+    async for facets in db.tasks.aggregate(pipeline):
+        for scope, groups in facets.items():
+            for group in groups:
+                counter_id = GLOBAL_COUNTER_ID if scope == "global" else f"{scope}:{group['_id']['owner']}"
+                counter = counters.setdefault(counter_id, {"_id": counter_id, "status_counts": {}})
+                counter["status_counts"][group["_id"]["status"]] = group["count"]
+    
+    counters[GLOBAL_COUNTER_ID]["workflows"] = await db.workflows.count_documents({})
+    
+    # Replace in place rather than wipe and reinsert, so concurrent $inc upserts or a second process
+    # rebuilding at the same boot never collide on _id
+    await db.task_counters.bulk_write([
+        ReplaceOne({"_id": counter_id}, counter, upsert=True) for counter_id, counter in counters.items()
+    ], ordered=False)
+    await db.task_counters.delete_many({"_id": {"$nin": list(counters)}})
+    return len(counters)
+
+async def rebuild_comment_counts():
+    """Recompute tasks.comment_count and last_comment_at from db.comments"""
+    await db.tasks.update_many({}, {"$set": {"comment_count": 0, "last_comment_at": None}})
+    operations = [
+        UpdateOne({"id": group["_id"]}, {"$set": {"comment_count": group["count"], "last_comment_at": group["last_comment_at"]}})
+        async for group in db.comments.aggregate([
+            {"$group": {"_id": "$task_id", "count": {"$sum": 1}, "last_comment_at": {"$max": "$created_at"}}}
+        ])
+    ]
+    if operations:
+        await db.tasks.bulk_write(operations, ordered=False)
+    return len(operations)
+
+# Task event stream - task_events relayed to this process's SSE subscribers
+class EventSubscription:
+    def __init__(self, user: User, buffer_size: int):
+        self.user = user
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        self.overflowed = False
+
+class EventBroker:
+    """Fans db.task_events out to this process's SSE subscribers
+
+    Writers stamp event ObjectIds before they commit, so each poll rereads the last lookback_seconds and skips
+    ids it has already relayed. Stream ids are assigned here on relay, which keeps them increasing per process.
+    """
+    
+    def __init__(self, buffer_size: int, history_size: int, poll_interval: float, lookback_seconds: float):
+        self.buffer_size = buffer_size
+        self.poll_interval = poll_interval
+        self.lookback = timedelta(seconds=lookback_seconds)
+        self._history: deque = deque(maxlen=history_size)
+        self._subscriptions: set = set()
+        self._relayed_ids: set = set()
+        self._primed = False
+        self._task: Optional[asyncio.Task] = None
+        self._last_event_id = 0
+        # Ids issued by earlier processes cannot be replayed
+        self.first_event_id = self._next_event_id()
+        self.published = 0
+        self.overflows = 0
+    
+    def _next_event_id(self) -> int:
+        # Microsecond timestamps keep ids increasing across restarts
+        self._last_event_id = max(self._last_event_id + 1, time.time_ns() // 1000)
+        return self._last_event_id
+    
+    @staticmethod
+    def is_visible(event: dict, user: User) -> bool:
+        return user.role == UserRole.ADMIN or user.id in (event["assignee_id"], event["approver_id"])
+    
+    def stream_event(self, event_doc: dict) -> dict:
+        event = {
+            "id": self._next_event_id(),
+            "event_id": str(event_doc["_id"]),
+            "type": event_doc.get("type", "task_status"),
+            "task_id": event_doc["task_id"],
+            "workflow_id": event_doc["workflow_id"],
+            "assignee_id": event_doc.get("assignee_id"),
+            "approver_id": event_doc.get("approver_id"),
+            "previous_status": event_doc.get("previous_status"),
+            "status": event_doc["status"],
+            "source": event_doc["source"],
+            "created_at": event_doc["created_at"].isoformat()
+        }
+        deadline = event_doc.get("details", {}).get("deadline")
+        if deadline is not None:
+            event["deadline"] = deadline.isoformat()
+        return event
+    
+    async def poll(self) -> int:
+        """Publish task events committed by any process since the last poll"""
+        since = ObjectId.from_datetime(datetime.utcnow() - self.lookback)
+        self._relayed_ids = {event_id for event_id in self._relayed_ids if event_id >= since}
+        event_docs = await db.task_events.find({"_id": {"$gte": since}}).sort("_id", ASCENDING).to_list(None)
+        
+        relayed = 0
+        for event_doc in event_docs:
+            if event_doc["_id"] in self._relayed_ids:
+                continue
+            self._relayed_ids.add(event_doc["_id"])
+            # The first poll only marks what was written before this process started listening
+            if self._primed:
+                self._publish(self.stream_event(event_doc))
+                relayed += 1
+        self._primed = True
+        return relayed
+    
+    async def run(self):
+        while True:
+            try:
+                await self.poll()
+            except Exception:
+                logger.exception("Event relay error")
+            await asyncio.sleep(self.poll_interval)
+    
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    def _publish(self, event: dict):
+        self._history.append(event)
+        self.published += 1
+        
+        for subscription in self._subscriptions:
+            if subscription.overflowed or not self.is_visible(event, subscription.user):
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow consumer - end its stream, the client resumes from its last event id
+                subscription.overflowed = True
+                self.overflows += 1
+    
+    def subscribe(self, user: User) -> EventSubscription:
+        subscription = EventSubscription(user, self.buffer_size)
+        self._subscriptions.add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription: EventSubscription):
+        self._subscriptions.discard(subscription)
+    
+    def replay(self, user: User, last_event_id: int) -> Optional[List[dict]]:
+        """Events after last_event_id visible to user, or None when they are no longer retained"""
+        if last_event_id < self.first_event_id:
+            return None
+        if len(self._history) == self._history.maxlen and last_event_id < self._history[0]["id"]:
+            return None
+        return [event for event in self._history if event["id"] > last_event_id and self.is_visible(event, user)]
+    
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscriptions),
+            "relaying": self._task is not None,
+            "history": len(self._history),
+            "published": self.published,
+            "overflows": self.overflows
+        }
+
+event_broker = EventBroker(EVENT_STREAM_BUFFER_SIZE, EVENT_HISTORY_SIZE, EVENT_RELAY_POLL_SECONDS, TASK_EVENT_SETTLE_SECONDS)
+
+def format_sse(event: dict) -> str:
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
 # Core workflow engine
-async def trigger_task_transitions(task_id: str, decision: str):
-    """Core workflow engine - handles automatic task transitions"""
+TRANSITION_TARGET_PROJECTION = {
+    "_id": 0, "id": 1, "title": 1, "status": 1, "deadline": 1, "workflow_id": 1, "assignee_id": 1, "approver_id": 1,
+    "version": 1
+}
+
+def transition_targets(task_doc: dict, decision: str) -> List[str]:
+    """Target ids of the task's automatic transitions for a decision"""
+    target_task_ids = []
+    for transition in task_doc.get("transitions", []):
+        if transition["transition_type"] == decision and transition.get("is_automatic", True):
+            target_task_ids.extend(transition["target_task_ids"])
+    return target_task_ids
+
+class TransitionGraphCache:
+    """Per-workflow adjacency (task id -> decision -> target ids), compiled lazily from db.tasks
+
+    Every transition edit bumps workflows.graph_version, and each lookup compares the cached versions
+    against it (one indexed read), so edits made in any process are seen on the next lookup.
+    """
+    
+    def __init__(self, ttl_seconds: float, max_workflows: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_workflows = max_workflows
+        self._graphs: "OrderedDict[str, tuple]" = OrderedDict()  # workflow id -> (expires_at, version, graph)
+        self._task_workflows: Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self.compiles = 0
+        self.invalidations = 0
+    
+    async def _versions(self, workflow_ids: List[str]) -> Dict[str, int]:
+        workflows = await db.workflows.find(
+            {"id": {"$in": workflow_ids}}, {"_id": 0, "id": 1, "graph_version": 1}
+        ).to_list(len(workflow_ids))
+        return {workflow["id"]: workflow.get("graph_version", 0) for workflow in workflows}
+    
+    async def _compile(self, workflow_id: str) -> Dict[str, Dict[str, List[str]]]:
+        self.compiles += 1
+        # Read the version first - an edit landing mid-compile leaves a lower version that the next lookup rejects
+        version = (await self._versions([workflow_id])).get(workflow_id, 0)
+        graph = {}
+        async for task_doc in db.tasks.find({"workflow_id": workflow_id}, {"_id": 0, "id": 1, "transitions": 1}):
+            graph[task_doc["id"]] = {
+                transition_type.value: transition_targets(task_doc, transition_type.value)
+                for transition_type in TransitionType
+            }
+        
+        self._drop(workflow_id)
+        self._graphs[workflow_id] = (time.monotonic() + self.ttl_seconds, version, graph)
+        for task_id in graph:
+            self._task_workflows[task_id] = workflow_id
+        while len(self._graphs) > self.max_workflows:
+            self._drop(next(iter(self._graphs)))
+        return graph
+    
+    def _drop(self, workflow_id: str):
+        entry = self._graphs.pop(workflow_id, None)
+        if entry is not None:
+            for task_id in entry[2]:
+                self._task_workflows.pop(task_id, None)
+    
+    def _cached_graph(self, workflow_id: Optional[str]):
+        entry = self._graphs.get(workflow_id) if workflow_id else None
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        self._graphs.move_to_end(workflow_id)
+        return entry[2]
+    
+    async def adjacency(self, task_ids: List[str]) -> Dict[str, Dict[str, List[str]]]:
+        """Adjacency entries for task_ids, compiling the workflows they belong to on a miss"""
+        cached_workflow_ids = list({
+            self._task_workflows[task_id] for task_id in task_ids if task_id in self._task_workflows
+        })
+        if cached_workflow_ids:
+            versions = await self._versions(cached_workflow_ids)
+            for workflow_id in cached_workflow_ids:
+                entry = self._graphs.get(workflow_id)
+                if entry is not None and entry[1] != versions.get(workflow_id):
+                    self._drop(workflow_id)
+        
+        result = {}
+        unresolved = []
+        for task_id in task_ids:
+            graph = self._cached_graph(self._task_workflows.get(task_id))
+            if graph is not None and task_id in graph:
+                self.hits += 1
+                result[task_id] = graph[task_id]
+            else:
+                unresolved.append(task_id)
+        
+        # Counted per task like hits, so hit_rate is a per-lookup ratio; compiles are counted per workflow
+        self.misses += len(unresolved)
+        if unresolved:
+            task_docs = await db.tasks.find(
+                {"id": {"$in": unresolved}}, {"_id": 0, "id": 1, "workflow_id": 1}
+            ).to_list(len(unresolved))
+            graphs = {}
+            for task_doc in task_docs:
+                workflow_id = task_doc["workflow_id"]
+                if workflow_id not in graphs:
+                    graphs[workflow_id] = await self._compile(workflow_id)
+                result[task_doc["id"]] = graphs[workflow_id].get(task_doc["id"], {})
+        
+        return result
+    
+    async def invalidate(self, workflow_id: str):
+        """Call after changing a workflow's tasks or transitions - bumps the version every process checks"""
+        self.invalidations += 1
+        await db.workflows.update_one({"id": workflow_id}, {"$inc": {"graph_version": 1}})
+        self._drop(workflow_id)
+    
+    def clear(self):
+        self._graphs.clear()
+        self._task_workflows.clear()
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "workflows": len(self._graphs),
+            "max_workflows": self.max_workflows,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "compiles": self.compiles,
+            "invalidations": self.invalidations,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+transition_graph_cache = TransitionGraphCache(TRANSITION_GRAPH_CACHE_TTL_SECONDS, TRANSITION_GRAPH_CACHE_MAX_WORKFLOWS)
+
+async def walk_transition_graph(task_id: str, decision: str, max_hops: int = TRANSITION_MAX_HOPS,
+                                max_fanout: int = TRANSITION_MAX_FANOUT):
+    """Breadth-first walk of automatic transitions from task_id over the compiled graph cache.
+    
+    Returns the reached task ids in visiting order and whether max_fanout cut the walk short.
+    """
+    visited = {task_id}
+    reached = []
+    frontier = [task_id]
+    truncated = False
+    
+    for _ in range(max_hops):
+        adjacency = await transition_graph_cache.adjacency(frontier)
+        candidate_ids = []
+        for node_id in frontier:
+            for target_task_id in adjacency.get(node_id, {}).get(decision, []):
+                if target_task_id in visited:
+                    continue
+                if len(reached) + len(candidate_ids) >= max_fanout:
+                    truncated = True
+                    break
+                visited.add(target_task_id)
+                candidate_ids.append(target_task_id)
+        
+        if not candidate_ids:
+            break
+        
+        reached.extend(candidate_ids)
+        frontier = candidate_ids
+        
+        if truncated:
+            break
+    
+    return reached, truncated
+
+def find_graph_cycle(adjacency: Dict[str, List[str]]) -> Optional[List[str]]:
+    """Path of node ids forming a cycle in an in-memory graph, or None"""
+    visiting, done = set(), set()
+    for root in adjacency:
+        if root in done:
+            continue
+        path = [root]
+        visiting.add(root)
+        stack = [iter(adjacency.get(root, []))]
+        while stack:
+            next_id = next(stack[-1], None)
+            if next_id is None:
+                stack.pop()
+                finished = path.pop()
+                visiting.discard(finished)
+                done.add(finished)
+            elif next_id in visiting:
+                return path[path.index(next_id):] + [next_id]
+            elif next_id not in done:
+                path.append(next_id)
+                visiting.add(next_id)
+                stack.append(iter(adjacency.get(next_id, [])))
+    return None
+
+async def find_transition_cycle(task_id: str, transitions: List[TaskTransition]) -> Optional[List[str]]:
+    """Path of task ids that would loop back to task_id if it had these transitions, or None.
+    
+    Cascades follow one decision type, so each type's automatic edges are checked separately.
+    """
+    for transition_type in TransitionType:
+        start_ids = []
+        for transition in transitions:
+            if transition.transition_type == transition_type and transition.is_automatic:
+                start_ids.extend(transition.target_task_ids)
+        
+        parents = {target_task_id: task_id for target_task_id in start_ids}
+        frontier = list(dict.fromkeys(start_ids))
+        while frontier:
+            if task_id in frontier:
+                path = [task_id]
+                node_id = parents[task_id]
+                while node_id != task_id:
+                    path.append(node_id)
+                    node_id = parents[node_id]
+                return [task_id] + path[::-1]
+            
+            nodes = await db.tasks.find(
+                {"id": {"$in": frontier}}, {"_id": 0, "id": 1, "transitions": 1}
+            ).to_list(len(frontier))
+            next_frontier = []
+            for node in nodes:
+                for target_task_id in transition_targets(node, transition_type.value):
+                    if target_task_id not in parents:
+                        parents[target_task_id] = node["id"]
+                        next_frontier.append(target_task_id)
+            frontier = next_frontier
+    
+    return None
+
+async def trigger_task_transitions(job: dict) -> int:
+    """Core workflow engine - applies one outbox job's transitions, returns how many tasks were transitioned
+
+    Safe to rerun for the same job: the targets and their previous status are saved on the job before the
+    first write, every write is stamped with the job id, and the side effects are marked once recorded.
+    """
+    task_id, decision = job["task_id"], job["decision"]
+    targets = job.get("targets")
+    if targets is None:
+        target_task_ids, truncated = await walk_transition_graph(task_id, decision)
+        if truncated:
+            logger.warning(f"Transition cascade from task {task_id} exceeded {TRANSITION_MAX_FANOUT} tasks and was cut short")
+        # Read the targets once (previous status feeds the counters), then trigger them all together
+        targets = await db.tasks.find(
+            {"id": {"$in": target_task_ids}}, TRANSITION_TARGET_PROJECTION
+        ).to_list(len(target_task_ids)) if target_task_ids else []
+        await db.transition_outbox.update_one({"id": job["id"]}, {"$set": {"targets": targets}})
+    if not targets:
+        return 0
+    
+    # Each write is guarded by the version that was read, so a target changed in between (or already
+    # written by an earlier attempt) is left alone. The job id marks which writes landed.
+    result = await db.tasks.bulk_write([
+        UpdateOne(
+            {"id": target["id"], "version": version_filter(target.get("version", 0))},
+            {"$set": {"status": TaskStatus.NOT_STARTED, "updated_at": datetime.utcnow(), "transition_job_id": job["id"]},
+             "$inc": {"version": 1}}
+        )
+        for target in targets
+    ], ordered=False)
+    if result.matched_count < len(targets):
+        applied_ids = set(await db.tasks.distinct(
+            "id", {"id": {"$in": [target["id"] for target in targets]}, "transition_job_id": job["id"]}
+        ))
+        skipped = len(targets) - len(applied_ids)
+        targets = [target for target in targets if target["id"] in applied_ids]
+        if skipped:
+            logger.info(f"Transition from task {task_id} skipped {skipped} tasks changed concurrently")
+    
+    if job.get("recorded"):
+        return len(targets)
+    await record_status_changes(
+        [(target, target["status"], TaskStatus.NOT_STARTED) for target in targets], "transition",
+        details={"trigger_task_id": task_id, "decision": decision}
+    )
+    await db.transition_outbox.update_one({"id": job["id"]}, {"$set": {"recorded": True}})
+    
+    # Notify the assignees
+    for target in targets:
+        notification_dispatcher.notify(
+            target["assignee_id"], target["id"], f"Task {target['title']} is ready to start"
+        )
+    
+    logger.info(f"Task transitions triggered for task {task_id} with decision {decision}: {len(targets)} tasks transitioned")
+    return len(targets)
+
+# Timed waits for the background loops. asyncio.wait_for on Python < 3.12 can swallow a cancel that
+# lands just as the awaited get/wait completes, leaving stop() waiting forever on a loop that never ends.
+async def wait_for_wakeup(event: asyncio.Event, timeout: float):
+    """Sleep until the event is set or the timeout passes"""
+    waiter = asyncio.ensure_future(event.wait())
+    try:
+        await asyncio.wait({waiter}, timeout=timeout)
+    finally:
+        waiter.cancel()
+
+async def queue_get(queue: asyncio.Queue, timeout: float):
+    """queue.get() raising asyncio.TimeoutError after timeout"""
+    getter = asyncio.ensure_future(queue.get())
     try:
-        # Get the task
-        task_doc = await db.tasks.find_one({"id": task_id})
-        if not task_doc:
+        await asyncio.wait({getter}, timeout=timeout)
+    except asyncio.CancelledError:
+        if not getter.cancel():
+            # An item arrived as we were cancelled - put it back rather than lose it
+            queue.put_nowait(getter.result())
+        raise
+    if getter.cancel():
+        raise asyncio.TimeoutError
+    return getter.result()
+
+# Notifications - queued by the engine, batched per recipient and delivered to every configured sink
+class LogFileSink:
+    name = "log"
+    
+    def __init__(self, path: str):
+        self.path = path
+    
+    def _write(self, lines: List[str]):
+        with open(self.path, "a") as f:
+            f.writelines(lines)
+    
+    async def deliver(self, batches: Dict[str, List[dict]]):
+        lines = [
+            json.dumps({"recipient_id": recipient_id, "notifications": notifications}, default=str) + "\n"
+            for recipient_id, notifications in batches.items()
+        ]
+        await asyncio.get_running_loop().run_in_executor(None, self._write, lines)
+
+class SmtpSink:
+    name = "smtp"
+    
+    def __init__(self, host: str, port: int, sender: str):
+        self.host = host
+        self.port = port
+        self.sender = sender
+    
+    def _send(self, messages: List[EmailMessage]):
+        with smtplib.SMTP(self.host, self.port, timeout=10) as smtp:
+            for message in messages:
+                smtp.send_message(message)
+    
+    async def deliver(self, batches: Dict[str, List[dict]]):
+        users = await db.users.find(
+            {"id": {"$in": list(batches.keys())}}, {"_id": 0, "id": 1, "email": 1}
+        ).to_list(len(batches))
+        emails = {user["id"]: user["email"] for user in users}
+        
+        messages = []
+        for recipient_id, notifications in batches.items():
+            if recipient_id not in emails:
+                continue
+            message = EmailMessage()
+            message["From"] = self.sender
+            message["To"] = emails[recipient_id]
+            message["Subject"] = f"{len(notifications)} task update(s)"
+            message.set_content("\n".join(notification["message"] for notification in notifications))
+            messages.append(message)
+        
+        if messages:
+            await asyncio.get_running_loop().run_in_executor(None, self._send, messages)
+
+class WebhookSink:
+    name = "webhook"
+    
+    def __init__(self, url: str):
+        self.url = url
+    
+    def _post(self, body: bytes):
+        request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"}, method="POST")
+        with urllib.request.urlopen(request, timeout=10) as response:
+            response.read()
+    
+    async def deliver(self, batches: Dict[str, List[dict]]):
+        body = json.dumps({"batches": batches}, default=str).encode()
+        await asyncio.get_running_loop().run_in_executor(None, self._post, body)
+
+def build_notification_sinks(names: List[str]) -> list:
+    factories = {
+        "log": lambda: LogFileSink(NOTIFICATION_LOG_FILE),
+        "smtp": lambda: SmtpSink(NOTIFICATION_SMTP_HOST, NOTIFICATION_SMTP_PORT, NOTIFICATION_SMTP_SENDER),
+        "webhook": lambda: WebhookSink(NOTIFICATION_WEBHOOK_URL)
+    }
+    unknown = [name for name in names if name not in factories]
+    if unknown:
+        raise ValueError(f"Unknown notification sinks: {', '.join(unknown)}")
+    return [factories[name]() for name in names]
+
+class NotificationDispatcher:
+    def __init__(self, sinks: list, batch_window: float, max_batch_size: int, queue_limit: int):
+        self.sinks = sinks
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.queue_limit = queue_limit
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.enqueued = 0
+        self.dropped = 0
+        self.batches = 0
+        self.delivered = {sink.name: 0 for sink in sinks}
+        self.failed = {sink.name: 0 for sink in sinks}
+    
+    def notify(self, recipient_id: str, task_id: str, message: str):
+        """Queue a notification without waiting - drops it when the queue is full or not running"""
+        if self._queue is None:
+            self.dropped += 1
             return
+        try:
+            self._queue.put_nowait({
+                "recipient_id": recipient_id,
+                "task_id": task_id,
+                "message": message,
+                "created_at": datetime.utcnow()
+            })
+            self.enqueued += 1
+        except asyncio.QueueFull:
+            self.dropped += 1
+    
+    async def _collect_batch(self) -> List[dict]:
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.batch_window
+        try:
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await queue_get(self._queue, timeout))
+                except asyncio.TimeoutError:
+                    break
+        except asyncio.CancelledError:
+            # Stopped mid-window - requeue so stop() delivers them
+            for notification in batch:
+                self._queue.put_nowait(notification)
+            raise
+        return batch
+    
+    async def flush(self, batch: List[dict]):
+        batches: Dict[str, List[dict]] = {}
+        for notification in batch:
+            recipient_id = notification.pop("recipient_id")
+            batches.setdefault(recipient_id, []).append(notification)
         
-        task = Task(**task_doc)
+        self.batches += 1
+        for sink in self.sinks:
+            try:
+                await sink.deliver(batches)
+                self.delivered[sink.name] += len(batch)
+            except Exception:
+                self.failed[sink.name] += len(batch)
+                logger.exception(f"Notification sink {sink.name} failed")
+    
+    async def run(self):
+        while True:
+            batch = await self._collect_batch()
+            await self.flush(batch)
+    
+    def start(self):
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_limit)
+            self._task = asyncio.create_task(self.run())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            
+            # Deliver whatever is still queued before shutting down
+            remaining = []
+            while not self._queue.empty():
+                remaining.append(self._queue.get_nowait())
+            if remaining:
+                await self.flush(remaining)
+            self._queue = None
+    
+    def stats(self) -> dict:
+        return {
+            "sinks": [sink.name for sink in self.sinks],
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "queue_limit": self.queue_limit,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "delivered": self.delivered,
+            "failed": self.failed
+        }
+
+notification_dispatcher = NotificationDispatcher(
+    build_notification_sinks(NOTIFICATION_SINKS),
+    NOTIFICATION_BATCH_WINDOW_SECONDS,
+    NOTIFICATION_MAX_BATCH_SIZE,
+    NOTIFICATION_QUEUE_LIMIT
+)
+
+# Transition outbox - approvals enqueue a job, the worker applies it with retries (at-least-once)
+class OutboxStatus(str, Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    DONE = "done"
+    FAILED = "failed"
+
+async def enqueue_transition_job(job_id: str, task_id: str, decision: str, session=None):
+    """Queue the job unless it already exists - the approval and the worker's sweep may both enqueue it"""
+    now = datetime.utcnow()
+    await db.transition_outbox.update_one({"id": job_id}, {"$setOnInsert": {
+        "id": job_id,
+        "task_id": task_id,
+        "decision": decision,
+        "status": OutboxStatus.PENDING.value,
+        "attempts": 0,
+        "available_at": now,
+        "created_at": now,
+        "last_error": None
+    }}, upsert=True, session=session)
+    transition_worker.wake()
+
+class TransitionOutboxWorker:
+    def __init__(self, poll_interval: float, lease_seconds: float, max_attempts: int):
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.processed = 0
+        self.retried = 0
+        self.failed = 0
+        self.transitioned_tasks = 0
+    
+    def wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+    
+    async def claim_job(self) -> Optional[dict]:
+        now = datetime.utcnow()
+        return await db.transition_outbox.find_one_and_update(
+            {"$or": [
+                {"status": OutboxStatus.PENDING.value, "available_at": {"$lte": now}},
+                # Lease expired - the worker holding it died mid-job
+                {"status": OutboxStatus.PROCESSING.value, "available_at": {"$lte": now}, "attempts": {"$lt": self.max_attempts}}
+            ]},
+            {"$set": {
+                "status": OutboxStatus.PROCESSING.value,
+                "available_at": now + timedelta(seconds=self.lease_seconds)
+            }, "$inc": {"attempts": 1}},
+            sort=[("available_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+    
+    async def process_job(self, job: dict):
+        try:
+            transitioned = await trigger_task_transitions(job)
+        except Exception as e:
+            logger.exception(f"Transition job {job['id']} failed (attempt {job['attempts']})")
+            if job["attempts"] >= self.max_attempts:
+                self.failed += 1
+                await self.finish_job(job, {"status": OutboxStatus.FAILED.value, "last_error": str(e)})
+                return
+            else:
+                self.retried += 1
+                backoff = self.poll_interval * 2 ** job["attempts"]
+                await db.transition_outbox.update_one({"id": job["id"]}, {"$set": {
+                    "status": OutboxStatus.PENDING.value,
+                    "available_at": datetime.utcnow() + timedelta(seconds=backoff),
+                    "last_error": str(e)
+                }})
+                return
         
-        # Find matching transitions
-        for transition in task.transitions:
-            if transition.transition_type.value == decision and transition.is_automatic:
-                # Trigger each target task
-                for target_task_id in transition.target_task_ids:
-                    await db.tasks.update_one(
-                        {"id": target_task_id},
-                        {"$set": {"status": TaskStatus.NOT_STARTED, "updated_at": datetime.utcnow()}}
-                    )
-                    
-                    # Send notification to assignee (placeholder)
-                    target_task_doc = await db.tasks.find_one({"id": target_task_id})
-                    if target_task_doc:
-                        print(f"Notification: Task {target_task_doc['title']} assigned to {target_task_doc['assignee_id']}")
+        self.processed += 1
+        self.transitioned_tasks += transitioned
+        await self.finish_job(
+            job, {"status": OutboxStatus.DONE.value, "completed_at": datetime.utcnow(), "transitioned": transitioned}
+        )
+    
+    async def requeue_lost_transitions(self, limit: int = 100):
+        """Enqueue jobs for decisions whose enqueue never ran (no transactions and the process died)
+
+        The decision and its pending_transition marker are written in one update, so the marker is the
+        durable record; it is cleared when the job finishes.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+        async for task_doc in db.tasks.find(
+            {"pending_transition.queued_at": {"$lte": cutoff}}, {"_id": 0, "id": 1, "pending_transition": 1}
+        ).limit(limit):
+            pending = task_doc["pending_transition"]
+            await enqueue_transition_job(pending["job_id"], task_doc["id"], pending["decision"])
+    
+    async def finish_job(self, job: dict, update: dict):
+        await db.transition_outbox.update_one({"id": job["id"]}, {"$set": update})
+        await db.tasks.update_one(
+            {"id": job["task_id"], "pending_transition.job_id": job["id"]}, {"$unset": {"pending_transition": ""}}
+        )
+    
+    async def fail_abandoned_jobs(self):
+        """Fail jobs whose last allowed attempt died mid-job; claim_job no longer picks them up"""
+        abandoned = {"status": OutboxStatus.PROCESSING.value, "available_at": {"$lte": datetime.utcnow()},
+                     "attempts": {"$gte": self.max_attempts}}
+        async for job in db.transition_outbox.find(abandoned, {"_id": 0, "id": 1, "task_id": 1}):
+            # Re-checked per job so a worker that finished it in the meantime keeps its result
+            result = await db.transition_outbox.update_one({**abandoned, "id": job["id"]}, {"$set": {
+                "status": OutboxStatus.FAILED.value, "last_error": "Lease expired on the last attempt"
+            }})
+            if result.modified_count:
+                self.failed += 1
+                await db.tasks.update_one(
+                    {"id": job["task_id"], "pending_transition.job_id": job["id"]}, {"$unset": {"pending_transition": ""}}
+                )
+    
+    async def drain(self) -> int:
+        """Process every job that is currently due"""
+        await self.fail_abandoned_jobs()
+        await self.requeue_lost_transitions()
+        drained = 0
+        while True:
+            job = await self.claim_job()
+            if job is None:
+                return drained
+            await self.process_job(job)
+            drained += 1
+    
+    async def run(self):
+        # Created here so the event belongs to the loop the worker runs on
+        self._wakeup = asyncio.Event()
+        while True:
+            self._wakeup.clear()
+            try:
+                await self.drain()
+            except Exception:
+                logger.exception("Transition outbox worker error")
+            await wait_for_wakeup(self._wakeup, self.poll_interval)
+    
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+    
+    async def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "pending": await db.transition_outbox.count_documents({"status": OutboxStatus.PENDING.value}),
+            "processing": await db.transition_outbox.count_documents({"status": OutboxStatus.PROCESSING.value}),
+            "processed": self.processed,
+            "retried": self.retried,
+            "failed": self.failed,
+            "transitioned_tasks": self.transitioned_tasks
+        }
+
+transition_worker = TransitionOutboxWorker(OUTBOX_POLL_INTERVAL_SECONDS, OUTBOX_LEASE_SECONDS, OUTBOX_MAX_ATTEMPTS)
+
+# Deadline scheduler - upcoming/overdue events from a heap holding only the next window of deadlines
+DEADLINE_OPEN_STATUSES = [TaskStatus.NOT_STARTED.value, TaskStatus.IN_PROGRESS.value, TaskStatus.REJECTED.value]
+
+def deadline_key(value: datetime) -> datetime:
+    """Naive UTC at millisecond precision, the way Mongo hands the deadline back"""
+    if value.tzinfo:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.replace(microsecond=value.microsecond // 1000 * 1000)
+
+class DeadlineScheduler:
+    def __init__(self, reminder_seconds: float, window_seconds: float):
+        self.reminder = timedelta(seconds=reminder_seconds)
+        self.window = timedelta(seconds=window_seconds)
+        self._heap: List[tuple] = []  # (fire_at, kind, task_id, deadline)
+        self._scheduled: set = set()  # (kind, task_id, deadline) of heap entries
+        self._loaded_until: Optional[datetime] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.fired = {"upcoming": 0, "overdue": 0}
+        self.skipped = 0
+        self.claimed_elsewhere = 0
+    
+    def _push(self, fire_at: datetime, kind: str, task_id: str, deadline: datetime):
+        if (kind, task_id, deadline) in self._scheduled:
+            return
+        self._scheduled.add((kind, task_id, deadline))
+        heapq.heappush(self._heap, (fire_at, kind, task_id, deadline))
+        if self._wakeup is not None and self._heap[0][0] == fire_at:
+            self._wakeup.set()
+    
+    def fire_times(self, deadline: datetime):
+        return (("upcoming", deadline - self.reminder), ("overdue", deadline))
+    
+    def schedule(self, task_doc: dict, status: str):
+        """Queue a created or reopened task whose deadline events fall inside the loaded window"""
+        if self._loaded_until is None or task_doc.get("deadline") is None or TaskStatus(status).value not in DEADLINE_OPEN_STATUSES:
+            return
+        deadline = deadline_key(task_doc["deadline"])
+        now = datetime.utcnow()
+        for kind, fire_at in self.fire_times(deadline):
+            if now < fire_at <= self._loaded_until:
+                self._push(fire_at, kind, task_doc["id"], deadline)
+    
+    def track_status_changes(self, changes: List[tuple]):
+        for task_doc, _, new_status in changes:
+            self.schedule(task_doc, new_status)
+    
+    async def load_window(self, start: datetime, end: datetime):
+        """Queue events firing in (start, end] - one range scan on (status, deadline) per kind"""
+        previous, self._loaded_until = self._loaded_until, end
+        try:
+            for kind, offset in (("overdue", timedelta(0)), ("upcoming", self.reminder)):
+                tasks = db.tasks.find(
+                    {"status": {"$in": DEADLINE_OPEN_STATUSES}, "deadline": {"$gt": start + offset, "$lte": end + offset}},
+                    {"_id": 0, "id": 1, "deadline": 1}
+                )
+                async for task in tasks:
+                    deadline = deadline_key(task["deadline"])
+                    self._push(deadline - offset, kind, task["id"], deadline)
+        except Exception:
+            self._loaded_until = previous
+            raise
+    
+    async def fire_due(self) -> int:
+        now = datetime.utcnow()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            self._scheduled.discard(entry[1:])
+            due.append(entry)
+        if not due:
+            return 0
         
-        print(f"Task transitions triggered for task {task_id} with decision {decision}")
+        task_ids = list({task_id for _, _, task_id, _ in due})
+        tasks = await db.tasks.find({"id": {"$in": task_ids}}, TRANSITION_TARGET_PROJECTION).to_list(len(task_ids))
+        tasks_by_id = {task["id"]: task for task in tasks}
         
-    except Exception as e:
-        print(f"Error triggering transitions: {e}")
+        fired = 0
+        for _, kind, task_id, deadline in due:
+            task = tasks_by_id.get(task_id)
+            # Entries aren't removed when tasks change - anything finished or rescheduled since is dropped here
+            if (not task or task["status"] not in DEADLINE_OPEN_STATUSES or task.get("deadline") is None
+                    or deadline_key(task["deadline"]) != deadline):
+                self.skipped += 1
+                continue
+            # One claim per (kind, deadline) across every process and restart - moving the deadline re-arms it
+            claim = await db.tasks.update_one(
+                {"id": task_id, "status": {"$in": DEADLINE_OPEN_STATUSES}, "deadline": task["deadline"],
+                 f"{kind}_notified_for": {"$ne": task["deadline"]}},
+                {"$set": {f"{kind}_notified_for": task["deadline"]}}
+            )
+            if not claim.modified_count:
+                self.claimed_elsewhere += 1
+                continue
+            await db.task_events.insert_one(deadline_event_doc(task, kind))
+            message = f"Task {task['title']} is overdue" if kind == "overdue" else \
+                f"Task {task['title']} is due {deadline:%Y-%m-%d %H:%M} UTC"
+            notification_dispatcher.notify(task["assignee_id"], task_id, message)
+            self.fired[kind] += 1
+            fired += 1
+        return fired
+    
+    async def run(self):
+        # Created here so the event belongs to the loop the scheduler runs on
+        self._wakeup = asyncio.Event()
+        self._heap, self._scheduled, self._loaded_until = [], set(), None
+        # Deadlines that passed while no scheduler was running are not replayed - GET /tasks/overdue lists them
+        now = datetime.utcnow()
+        while True:
+            self._wakeup.clear()
+            try:
+                if self._loaded_until is None:
+                    await self.load_window(now, now + self.window)
+                elif now + self.window / 2 >= self._loaded_until:
+                    await self.load_window(self._loaded_until, now + self.window)
+                await self.fire_due()
+            except Exception:
+                logger.exception("Deadline scheduler error")
+            
+            now = datetime.utcnow()
+            wait_until = (self._loaded_until or now) - self.window / 2
+            if self._heap:
+                wait_until = min(wait_until, self._heap[0][0])
+            await wait_for_wakeup(self._wakeup, max((wait_until - now).total_seconds(), 0.1))
+            now = datetime.utcnow()
+    
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+            self._loaded_until = None
+    
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "queued": len(self._heap),
+            "loaded_until": self._loaded_until.isoformat() if self._loaded_until else None,
+            "fired_upcoming": self.fired["upcoming"],
+            "fired_overdue": self.fired["overdue"],
+            "skipped": self.skipped,
+            "claimed_elsewhere": self.claimed_elsewhere
+        }
+
+deadline_scheduler = DeadlineScheduler(DEADLINE_REMINDER_SECONDS, DEADLINE_WINDOW_SECONDS)
 
 # Authentication endpoints
 @api_router.post("/auth/register", response_model=User)
@@ -224,7 +1869,7 @@ async def register(user_data: UserCreate):
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create new user
-    password_hash = get_password_hash(user_data.password)
+    password_hash = await password_hasher.hash(user_data.password)
     user = User(
         email=user_data.email,
         name=user_data.name,
@@ -232,7 +1877,11 @@ async def register(user_data: UserCreate):
         role=user_data.role
     )
     
-    await db.users.insert_one(user.dict())
+    try:
+        await db.users.insert_one(user.dict())
+    except DuplicateKeyError:
+        # A concurrent registration won the unique email index between the check and the insert
+        raise HTTPException(status_code=400, detail="Email already registered")
     return user
 
 @api_router.post("/auth/login", response_model=Token)
@@ -245,7 +1894,7 @@ async def login(user_data: UserLogin):
     user = User(**user_doc)
     
     # Verify password
-    if not verify_password(user_data.password, user.password_hash):
+    if not await password_hasher.verify(user_data.password, user.password_hash):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     # Create token
@@ -273,37 +1922,145 @@ async def create_workflow(workflow_data: WorkflowCreate, current_user: User = De
     )
     
     await db.workflows.insert_one(workflow.dict())
+    await db.task_counters.update_one({"_id": GLOBAL_COUNTER_ID}, {"$inc": {"workflows": 1}}, upsert=True)
     return workflow
 
-@api_router.get("/workflows", response_model=List[Workflow])
-async def get_workflows(current_user: User = Depends(get_current_user)):
-    if current_user.role == UserRole.ADMIN:
-        workflows = await db.workflows.find().to_list(100)
-    else:
-        # Get workflows where user is involved
-        user_tasks = await db.tasks.find({
-            "$or": [
-                {"assignee_id": current_user.id},
-                {"approver_id": current_user.id}
+@api_router.post("/workflows/import", response_model=Workflow)
+async def import_workflow(workflow_data: WorkflowImport, current_user: User = Depends(get_current_user)):
+    """Create a workflow with all of its tasks and transitions in one request"""
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Only admins can import workflows")
+    
+    if len(workflow_data.tasks) > MAX_IMPORT_TASKS:
+        raise HTTPException(status_code=400, detail=f"Cannot import more than {MAX_IMPORT_TASKS} tasks at once")
+    
+    # Resolve local refs to server-generated ids
+    task_ids = {}
+    for task_data in workflow_data.tasks:
+        if task_data.ref in task_ids:
+            raise HTTPException(status_code=400, detail=f"Duplicate task ref: {task_data.ref}")
+        task_ids[task_data.ref] = str(uuid.uuid4())
+    
+    unknown_refs = sorted({
+        target_ref
+        for task_data in workflow_data.tasks
+        for transition in task_data.transitions
+        for target_ref in transition.target_refs
+        if target_ref not in task_ids
+    })
+    if unknown_refs:
+        raise HTTPException(status_code=400, detail=f"Unknown task refs in transitions: {', '.join(unknown_refs)}")
+    
+    # Cascades follow one decision type, so each type's automatic edges must be acyclic
+    for transition_type in TransitionType:
+        adjacency = {
+            task_data.ref: [
+                target_ref
+                for transition in task_data.transitions
+                if transition.transition_type == transition_type and transition.is_automatic
+                for target_ref in transition.target_refs
             ]
-        }).to_list(100)
-        
-        workflow_ids = list(set([task["workflow_id"] for task in user_tasks]))
-        workflows = await db.workflows.find({"id": {"$in": workflow_ids}}).to_list(100)
+            for task_data in workflow_data.tasks
+        }
+        cycle = find_graph_cycle(adjacency)
+        if cycle:
+            raise HTTPException(status_code=400, detail=f"Transitions would create a cycle: {' -> '.join(cycle)}")
+    
+    workflow = Workflow(
+        name=workflow_data.name,
+        description=workflow_data.description,
+        created_by=current_user.id
+    )
+    tasks = [
+        Task(
+            id=task_ids[task_data.ref],
+            title=task_data.title,
+            description=task_data.description,
+            deadline=task_data.deadline,
+            assignee_id=task_data.assignee_id,
+            approver_id=task_data.approver_id,
+            workflow_id=workflow.id,
+            transitions=[
+                TaskTransition(
+                    transition_type=transition.transition_type,
+                    target_task_ids=[task_ids[target_ref] for target_ref in transition.target_refs],
+                    is_automatic=transition.is_automatic
+                )
+                for transition in task_data.transitions
+            ]
+        )
+        for task_data in workflow_data.tasks
+    ]
     
-    return [Workflow(**workflow) for workflow in workflows]
+    await db.workflows.insert_one(workflow.dict())
+    await db.task_counters.update_one({"_id": GLOBAL_COUNTER_ID}, {"$inc": {"workflows": 1}}, upsert=True)
+    if tasks:
+        task_docs = [task.dict() for task in tasks]
+        await db.tasks.insert_many(task_docs)
+        await record_status_changes(
+            [(task_doc, None, task_doc["status"]) for task_doc in task_docs], "import", current_user.id
+        )
+    
+    workflow.tasks = tasks
+    return workflow
 
-@api_router.get("/workflows/{workflow_id}", response_model=Workflow)
-async def get_workflow(workflow_id: str, current_user: User = Depends(get_current_user)):
-    workflow = await db.workflows.find_one({"id": workflow_id})
+@api_router.get("/workflows", response_model=List[Workflow])
+async def get_workflows(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_user)
+):
+    workflows = await list_user_workflows(current_user, response, cursor, limit)
+    return json_response([Workflow(**workflow).model_dump() for workflow in workflows], response)
+
+async def list_user_workflows(user: User, response: Response, cursor: Optional[str] = None,
+                              limit: int = DEFAULT_PAGE_SIZE) -> List[dict]:
+    if user.role == UserRole.ADMIN:
+        return await paginate(db.workflows, {}, response, cursor, limit)
+    
+    # Get workflows where user is involved - ids first (from the owner indexes), so the page itself is a keyset
+    # scan on workflows' (created_at, id) index rather than a sort over joined documents
+    workflow_ids = await db.tasks.distinct("workflow_id", {"$or": [
+        {"assignee_id": user.id},
+        {"approver_id": user.id}
+    ]})
+    return await paginate(db.workflows, {"id": {"$in": workflow_ids}}, response, cursor, limit)
+
+@api_router.get("/workflows/{workflow_id}", response_model=None, responses={200: {"model": Workflow}})
+async def get_workflow(
+    workflow_id: str,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    view: ListView = ListView.FULL,
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    workflow = await db.workflows.find_one({"id": workflow_id}, {"_id": 0, "graph_version": 0})
     if not workflow:
         raise HTTPException(status_code=404, detail="Workflow not found")
     
-    # Get tasks for this workflow
-    tasks = await db.tasks.find({"workflow_id": workflow_id}).to_list(100)
-    workflow["tasks"] = [Task(**task) for task in tasks]
+    # Get one page of tasks for this workflow - X-Next-Cursor is set when there are more
+    projection, model = task_projection(view, fields)
+    tasks = await paginate(db.tasks, {"workflow_id": workflow_id}, response, cursor, limit, projection=projection)
+    
+    etag = compute_etag(
+        workflow_id, workflow["created_at"], view.value, fields, cursor, response.headers.get(NEXT_CURSOR_HEADER),
+        *(f"{task['id']}@{task['updated_at']}#{task.get('comment_count', 0)}" for task in tasks)
+    )
+    last_modified = max([workflow["created_at"]] + [task_modified_at(task) for task in tasks])
+    not_modified = conditional_response(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+    
+    if model is Task:
+        workflow["tasks"] = [Task(**task) for task in tasks]
+        return json_response(Workflow(**workflow).model_dump(), response)
     
-    return Workflow(**workflow)
+    workflow["tasks"] = serialize_tasks(tasks, model)
+    return json_response(workflow, response)
 
 # Task endpoints
 @api_router.post("/workflows/{workflow_id}/tasks", response_model=Task)
@@ -327,8 +2084,133 @@ async def create_task(workflow_id: str, task_data: TaskCreate, current_user: Use
     )
     
     await db.tasks.insert_one(task.dict())
+    await record_status_change(task.dict(), None, task.status, "create", current_user.id)
+    await transition_graph_cache.invalidate(workflow_id)
     return task
 
+def batch_result(results: List[BatchItemResult]) -> BatchResult:
+    succeeded = sum(1 for result in results if result.error is None)
+    return BatchResult(succeeded=succeeded, failed=len(results) - succeeded, results=results)
+
+def check_batch_size(items: list):
+    if len(items) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Batches are limited to {MAX_BATCH_ITEMS} items")
+
+@api_router.post("/workflows/{workflow_id}/tasks:batch", response_model=BatchResult)
+async def create_tasks_batch(workflow_id: str, tasks_data: List[TaskCreate], current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Only admins can create tasks")
+    
+    check_batch_size(tasks_data)
+    
+    # Verify workflow exists
+    workflow = await db.workflows.find_one({"id": workflow_id}, {"_id": 0, "id": 1})
+    if not workflow:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    
+    task_docs = [
+        Task(
+            title=task_data.title,
+            description=task_data.description,
+            deadline=task_data.deadline,
+            assignee_id=task_data.assignee_id,
+            approver_id=task_data.approver_id,
+            workflow_id=workflow_id,
+            transitions=task_data.transitions
+        ).dict()
+        for task_data in tasks_data
+    ]
+    if not task_docs:
+        return batch_result([])
+    
+    write_errors = {}
+    try:
+        await db.tasks.bulk_write([InsertOne(task_doc) for task_doc in task_docs], ordered=False)
+    except BulkWriteError as e:
+        write_errors = {error["index"]: error["errmsg"] for error in e.details["writeErrors"]}
+    
+    created = [task_doc for index, task_doc in enumerate(task_docs) if index not in write_errors]
+    await record_status_changes([(task_doc, None, task_doc["status"]) for task_doc in created], "create", current_user.id)
+    await transition_graph_cache.invalidate(workflow_id)
+    
+    return batch_result([
+        BatchItemResult(index=index, id=task_doc["id"], status_code=500, error=write_errors[index])
+        if index in write_errors else
+        BatchItemResult(index=index, id=task_doc["id"], status_code=200)
+        for index, task_doc in enumerate(task_docs)
+    ])
+
+@api_router.put("/tasks/status:batch", response_model=BatchResult)
+async def update_task_status_batch(updates: List[TaskStatusUpdate], current_user: User = Depends(get_current_user)):
+    check_batch_size(updates)
+    
+    task_ids = [update.task_id for update in updates]
+    tasks = await db.tasks.find(
+        {"id": {"$in": task_ids}}, TRANSITION_TARGET_PROJECTION
+    ).to_list(len(task_ids))
+    tasks_by_id = {task["id"]: task for task in tasks}
+    
+    item_results = {}
+    pending = {}  # task id -> (index, update)
+    seen_ids = set()
+    for index, update in enumerate(updates):
+        if update.task_id in seen_ids:
+            item_results[index] = BatchItemResult(index=index, id=update.task_id, status_code=400, error="Duplicate task in batch")
+        else:
+            pending[update.task_id] = (index, update)
+        seen_ids.add(update.task_id)
+    
+    # Each write is guarded by the version that was read, so the previous status fed to the counters and
+    # history is the one actually replaced. Rows changed in between are re-read and tried again.
+    batch_id = str(uuid.uuid4())
+    changes = []
+    for _ in range(STATUS_BATCH_MAX_ROUNDS):
+        attempted = {}
+        for task_id, (index, update) in list(pending.items()):
+            task = tasks_by_id.get(task_id)
+            if not task:
+                item_results[index] = BatchItemResult(index=index, id=task_id, status_code=404, error="Task not found")
+                del pending[task_id]
+            elif current_user.role == UserRole.ASSIGNEE and task["assignee_id"] != current_user.id:
+                item_results[index] = BatchItemResult(index=index, id=task_id, status_code=403, error="Not authorized")
+                del pending[task_id]
+            else:
+                attempted[task_id] = task
+        if not attempted:
+            break
+        
+        now = datetime.utcnow()
+        result = await db.tasks.bulk_write([
+            UpdateOne(
+                {"id": task_id, "version": version_filter(task.get("version", 0))},
+                {"$set": {"status": pending[task_id][1].status, "updated_at": now, "status_batch_id": batch_id},
+                 "$inc": {"version": 1}}
+            )
+            for task_id, task in attempted.items()
+        ], ordered=False)
+        applied_ids = set(attempted)
+        if result.matched_count < len(attempted):
+            # Rows stamped with this batch were written; the others are re-read for the next round
+            current = await db.tasks.find(
+                {"id": {"$in": list(attempted)}}, {**TRANSITION_TARGET_PROJECTION, "status_batch_id": 1}
+            ).to_list(len(attempted))
+            current_by_id = {task["id"]: task for task in current}
+            applied_ids = {task_id for task_id, task in current_by_id.items() if task.get("status_batch_id") == batch_id}
+            for task_id in set(attempted) - applied_ids:
+                tasks_by_id[task_id] = current_by_id.get(task_id)
+        
+        for task_id in applied_ids:
+            index, update = pending.pop(task_id)
+            changes.append((attempted[task_id], attempted[task_id]["status"], update.status))
+            item_results[index] = BatchItemResult(index=index, id=task_id, status_code=200)
+    
+    for task_id, (index, update) in pending.items():
+        item_results[index] = BatchItemResult(index=index, id=task_id, status_code=409, error="Task was modified concurrently")
+    
+    await record_status_changes(changes, "status_update", current_user.id)
+    
+    return batch_result([item_results[index] for index in range(len(updates))])
+
 @api_router.put("/tasks/{task_id}")
 async def update_task(task_id: str, transitions: List[TaskTransition], current_user: User = Depends(get_current_user)):
     if current_user.role != UserRole.ADMIN:
@@ -338,103 +2220,232 @@ async def update_task(task_id: str, transitions: List[TaskTransition], current_u
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
+    cycle = await find_transition_cycle(task_id, transitions)
+    if cycle:
+        raise HTTPException(status_code=400, detail=f"Transitions would create a cycle: {' -> '.join(cycle)}")
+    
     await db.tasks.update_one(
         {"id": task_id},
-        {"$set": {"transitions": [t.dict() for t in transitions], "updated_at": datetime.utcnow()}}
+        {"$set": {"transitions": [t.dict() for t in transitions], "updated_at": datetime.utcnow()}, "$inc": {"version": 1}}
     )
+    await transition_graph_cache.invalidate(task["workflow_id"])
     
     return {"message": "Task updated successfully"}
 
-@api_router.get("/tasks", response_model=List[Task])
-async def get_user_tasks(current_user: User = Depends(get_current_user)):
-    if current_user.role == UserRole.ADMIN:
-        tasks = await db.tasks.find().to_list(100)
-    elif current_user.role == UserRole.ASSIGNEE:
-        tasks = await db.tasks.find({"assignee_id": current_user.id}).to_list(100)
+@api_router.get("/tasks", response_model=None, responses={200: {"model": List[Task]}})
+async def get_user_tasks(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    view: ListView = ListView.FULL,
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    projection, model = task_projection(view, fields)
+    tasks = await list_user_tasks(current_user, response, cursor, limit, projection)
+    
+    etag = compute_etag(
+        view.value, fields, response.headers.get(NEXT_CURSOR_HEADER),
+        *(f"{task['id']}@{task['updated_at']}#{task.get('comment_count', 0)}" for task in tasks)
+    )
+    last_modified = max((task_modified_at(task) for task in tasks), default=None)
+    not_modified = conditional_response(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+    
+    return json_response(serialize_tasks(tasks, model), response)
+
+@api_router.get("/tasks/overdue", response_model=None, responses={200: {"model": List[Task]}})
+async def get_overdue_tasks(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    view: ListView = ListView.FULL,
+    current_user: User = Depends(get_current_user)
+):
+    """Open tasks past their deadline, most overdue first - a range on the (owner,) status, deadline, id indexes"""
+    query = {"status": {"$in": DEADLINE_OPEN_STATUSES}, "deadline": {"$lt": datetime.utcnow()}}
+    if current_user.role == UserRole.ASSIGNEE:
+        query["assignee_id"] = current_user.id
     elif current_user.role == UserRole.APPROVER:
-        tasks = await db.tasks.find({"approver_id": current_user.id}).to_list(100)
-    else:
-        tasks = []
+        query["approver_id"] = current_user.id
     
-    return [Task(**task) for task in tasks]
+    projection, model = task_projection(view, None)
+    tasks = await paginate(db.tasks, query, response, cursor, limit, sort_field="deadline", projection=projection)
+    return json_response(serialize_tasks(tasks, model), response)
 
-@api_router.get("/tasks/{task_id}", response_model=Task)
-async def get_task(task_id: str, current_user: User = Depends(get_current_user)):
+async def list_user_tasks(user: User, response: Response, cursor: Optional[str] = None,
+                          limit: int = DEFAULT_PAGE_SIZE, projection: Optional[dict] = None) -> List[dict]:
+    if user.role == UserRole.ADMIN:
+        return await paginate(db.tasks, {}, response, cursor, limit, projection=projection)
+    elif user.role == UserRole.ASSIGNEE:
+        return await paginate(db.tasks, {"assignee_id": user.id}, response, cursor, limit, projection=projection)
+    elif user.role == UserRole.APPROVER:
+        return await paginate(db.tasks, {"approver_id": user.id}, response, cursor, limit, projection=projection)
+    return []
+
+@api_router.get("/tasks/{task_id}", response_model=Task, responses={304: {"description": "Not modified"}})
+async def get_task(task_id: str, request: Request, response: Response, current_user: User = Depends(get_current_user)):
     task = await db.tasks.find_one({"id": task_id})
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    return Task(**task)
+    not_modified = conditional_response(request, response, compute_etag(task_id, task["updated_at"], task.get("comment_count", 0)), task_modified_at(task))
+    if not_modified:
+        return not_modified
+    
+    return json_response(Task(**task).model_dump(), response)
 
 @api_router.put("/tasks/{task_id}/status")
 async def update_task_status(task_id: str, status: TaskStatus, current_user: User = Depends(get_current_user)):
-    task = await db.tasks.find_one({"id": task_id})
+    # Check permissions in the write itself and take the previous status from the same atomic step
+    task_filter = {"id": task_id}
+    if current_user.role == UserRole.ASSIGNEE:
+        task_filter["assignee_id"] = current_user.id
+    task = await db.tasks.find_one_and_update(
+        task_filter,
+        {"$set": {"status": status, "updated_at": datetime.utcnow()}, "$inc": {"version": 1}},
+        projection=TRANSITION_TARGET_PROJECTION,
+        return_document=ReturnDocument.BEFORE
+    )
     if not task:
+        if current_user.role == UserRole.ASSIGNEE:
+            raise await task_write_conflict(task_id, "assignee_id", current_user, "Task was modified")
         raise HTTPException(status_code=404, detail="Task not found")
-    
-    # Check permissions
-    if current_user.role == UserRole.ASSIGNEE and task["assignee_id"] != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
-    await db.tasks.update_one(
-        {"id": task_id},
-        {"$set": {"status": status, "updated_at": datetime.utcnow()}}
-    )
+    await record_status_change(task, task["status"], status, "status_update", current_user.id)
     
     return {"message": "Task status updated"}
 
 # Task submission endpoints
 @api_router.post("/tasks/{task_id}/submit", response_model=TaskSubmission)
 async def submit_task(task_id: str, submission_data: TaskSubmissionCreate, current_user: User = Depends(get_current_user)):
-    task = await db.tasks.find_one({"id": task_id})
+    submission = TaskSubmission(task_id=task_id, assignee_id=current_user.id)
+    submission.size = await store_submission_content(submission.id, bytes_stream(submission_data.content.encode()))
+    return await record_submission(submission, submission_data.version, current_user)
+
+@api_router.post("/tasks/{task_id}/submit/upload", response_model=TaskSubmission)
+async def upload_submission(
+    task_id: str,
+    request: Request,
+    filename: Optional[str] = None,
+    version: Optional[int] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Submit a raw request body of any size, streamed to storage chunk by chunk"""
+    task = await db.tasks.find_one({"id": task_id}, {"_id": 0, "assignee_id": 1, "status": 1, "version": 1})
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    
     if task["assignee_id"] != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
+    # Reject before streaming the body - record_submission re-checks both atomically
+    if task["status"] in (TaskStatus.SUBMITTED, TaskStatus.APPROVED) or \
+            (version is not None and (task.get("version") or 0) != version):
+        raise HTTPException(status_code=409, detail="Task is not awaiting submission or was modified")
+    
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > SUBMISSION_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Submission exceeds {SUBMISSION_MAX_BYTES} bytes")
     
     submission = TaskSubmission(
         task_id=task_id,
         assignee_id=current_user.id,
-        content=submission_data.content
+        filename=filename,
+        content_type=request.headers.get("content-type", "application/octet-stream")
     )
+    submission.size = await store_submission_content(submission.id, request.stream())
+    return await record_submission(submission, version, current_user)
+
+async def record_submission(submission: TaskSubmission, version: Optional[int], current_user: User) -> TaskSubmission:
+    """Move the task to submitted and save the metadata; content must already be stored"""
+    # Guarded on status (and version when the client sends one) so a submit can't overwrite a decision
+    task_filter = {
+        "id": submission.task_id,
+        "assignee_id": current_user.id,
+        "status": {"$nin": [TaskStatus.SUBMITTED, TaskStatus.APPROVED]}
+    }
+    if version is not None:
+        task_filter["version"] = version_filter(version)
     
-    await db.task_submissions.insert_one(submission.dict())
+    async def apply(session):
+        task = await db.tasks.find_one_and_update(
+            task_filter,
+            {"$set": {"status": TaskStatus.SUBMITTED, "updated_at": datetime.utcnow()}, "$inc": {"version": 1}},
+            return_document=ReturnDocument.BEFORE,
+            session=session
+        )
+        if task:
+            await db.task_submissions.insert_one(submission.dict(), session=session)
+            await record_task_events(
+                [(task, task["status"], TaskStatus.SUBMITTED)], "submit", current_user.id,
+                {"submission_id": submission.id}, session=session
+            )
+        return task
     
-    # Update task status
-    await db.tasks.update_one(
-        {"id": task_id},
-        {"$set": {"status": TaskStatus.SUBMITTED, "updated_at": datetime.utcnow()}}
-    )
+    try:
+        task = await transactions.run(apply)
+    except BaseException:
+        await delete_submission_content(submission.id)
+        raise
+    if not task:
+        await delete_submission_content(submission.id)
+        raise await task_write_conflict(submission.task_id, "assignee_id", current_user, "Task is not awaiting submission or was modified")
+    await apply_status_changes([(task, task["status"], TaskStatus.SUBMITTED)], "submit")
     
     return submission
 
 @api_router.get("/tasks/{task_id}/submissions", response_model=List[TaskSubmission])
-async def get_task_submissions(task_id: str, current_user: User = Depends(get_current_user)):
+async def get_task_submissions(
+    task_id: str,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_user)
+):
     task = await db.tasks.find_one({"id": task_id})
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    submissions = await db.task_submissions.find({"task_id": task_id}).to_list(100)
-    return [TaskSubmission(**submission) for submission in submissions]
+    # Metadata only - inline content from older submissions is left on the server
+    submissions = await paginate(
+        db.task_submissions, {"task_id": task_id}, response, cursor, limit,
+        sort_field="submitted_at", projection={"_id": 0, "content": 0}
+    )
+    return json_response([TaskSubmission(**submission).model_dump() for submission in submissions], response)
+
+@api_router.get("/tasks/{task_id}/submissions/{submission_id}/content")
+async def download_submission(task_id: str, submission_id: str, current_user: User = Depends(get_current_user)):
+    submission = await db.task_submissions.find_one({"id": submission_id, "task_id": task_id}, {"_id": 0})
+    if not submission:
+        raise HTTPException(status_code=404, detail="Submission not found")
+    
+    headers = {}
+    if submission.get("size") is not None:
+        headers["Content-Length"] = str(submission["size"])
+    if submission.get("filename"):
+        headers["Content-Disposition"] = f"attachment; filename*=UTF-8''{urllib.parse.quote(submission['filename'])}"
+    return StreamingResponse(
+        iter_submission_content(submission),
+        media_type=submission.get("content_type", "text/plain; charset=utf-8"),
+        headers=headers
+    )
 
 # Task approval endpoints
 @api_router.post("/tasks/{task_id}/approve", response_model=TaskApproval)
 async def approve_task(task_id: str, approval_data: TaskApprovalCreate, current_user: User = Depends(get_current_user)):
-    task = await db.tasks.find_one({"id": task_id})
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    
-    if task["approver_id"] != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
     # Get latest submission
     submission = await db.task_submissions.find_one(
         {"task_id": task_id},
+        {"_id": 0, "id": 1},
         sort=[("submitted_at", -1)]
     )
     
     if not submission:
+        task = await db.tasks.find_one({"id": task_id}, {"_id": 0, "approver_id": 1})
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
+        if task["approver_id"] != current_user.id:
+            raise HTTPException(status_code=403, detail="Not authorized")
         raise HTTPException(status_code=400, detail="No submission found")
     
     approval = TaskApproval(
@@ -445,25 +2456,51 @@ async def approve_task(task_id: str, approval_data: TaskApprovalCreate, current_
         comments=approval_data.comments
     )
     
-    await db.task_approvals.insert_one(approval.dict())
-    
-    # Update task status
+    # Only one decision per submission - concurrent approvals race on this update and the loser gets 409
     new_status = TaskStatus.APPROVED if approval_data.decision == "approved" else TaskStatus.REJECTED
-    await db.tasks.update_one(
-        {"id": task_id},
-        {"$set": {"status": new_status, "updated_at": datetime.utcnow()}}
-    )
+    task_filter = {"id": task_id, "approver_id": current_user.id, "status": TaskStatus.SUBMITTED}
+    if approval_data.version is not None:
+        task_filter["version"] = version_filter(approval_data.version)
+    
+    # The marker goes in with the decision itself, so even without transactions a crash before the
+    # enqueue below leaves a record the outbox worker's sweep turns into the job
+    job_id = str(uuid.uuid4())
     
-    # Trigger workflow transitions
-    await trigger_task_transitions(task_id, approval_data.decision)
+    async def apply(session):
+        now = datetime.utcnow()
+        task = await db.tasks.find_one_and_update(
+            task_filter,
+            {"$set": {
+                "status": new_status,
+                "updated_at": now,
+                "pending_transition": {"job_id": job_id, "decision": approval_data.decision, "queued_at": now}
+            }, "$inc": {"version": 1}},
+            return_document=ReturnDocument.BEFORE,
+            session=session
+        )
+        if task:
+            await db.task_approvals.insert_one(approval.dict(), session=session)
+            await record_task_events(
+                [(task, task["status"], new_status)], "approval", current_user.id,
+                {"approval_id": approval.id, "submission_id": submission["id"], "decision": approval.decision},
+                session=session
+            )
+            # Trigger workflow transitions in the background
+            await enqueue_transition_job(job_id, task_id, approval_data.decision, session=session)
+        return task
+    
+    task = await transactions.run(apply)
+    if not task:
+        raise await task_write_conflict(task_id, "approver_id", current_user, "Task is not awaiting approval or was modified")
+    await apply_status_changes([(task, task["status"], new_status)], "approval")
+    transition_worker.wake()  # the job is only visible once the transaction commits
     
     return approval
 
 # Comment endpoints
 @api_router.post("/tasks/{task_id}/comments", response_model=Comment)
 async def add_comment(task_id: str, comment_data: CommentCreate, current_user: User = Depends(get_current_user)):
-    task = await db.tasks.find_one({"id": task_id})
-    if not task:
+    if not await db.tasks.find_one({"id": task_id}, {"_id": 0, "id": 1}):
         raise HTTPException(status_code=404, detail="Task not found")
     
     comment = Comment(
@@ -472,83 +2509,223 @@ async def add_comment(task_id: str, comment_data: CommentCreate, current_user: U
         content=comment_data.content
     )
     
-    await db.comments.insert_one(comment.dict())
+    # Comment first, count second - without a transaction a failure in between leaves the count one short
+    # (repaired by rebuild-counters) rather than counting a comment that was never stored.
+    # updated_at and version are left alone, a comment isn't a task edit, but last_comment_at moves Last-Modified
+    async def apply(session):
+        await db.comments.insert_one(comment.dict(), session=session)
+        await db.tasks.update_one(
+            {"id": task_id}, {"$inc": {"comment_count": 1}, "$set": {"last_comment_at": comment.created_at}},
+            session=session
+        )
+    
+    await transactions.run(apply)
     return comment
 
 @api_router.get("/tasks/{task_id}/comments", response_model=List[Comment])
-async def get_task_comments(task_id: str, current_user: User = Depends(get_current_user)):
-    comments = await db.comments.find({"task_id": task_id}).to_list(100)
-    return [Comment(**comment) for comment in comments]
+async def get_task_comments(
+    task_id: str,
+    response: Response,
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    after_id: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_user)
+):
+    """Oldest first; pass after_id (the last comment seen) or since to fetch only newer comments"""
+    query = {"task_id": task_id}
+    if after_id:
+        anchor = await db.comments.find_one({"id": after_id, "task_id": task_id}, {"_id": 0, "created_at": 1})
+        if not anchor:
+            raise HTTPException(status_code=400, detail="Unknown after_id")
+        query = {"$and": [query, keyset_after("created_at", anchor["created_at"], after_id)]}
+    elif since:
+        if since.tzinfo:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        query["created_at"] = {"$gt": since}
+    
+    comments = await paginate(db.comments, query, response, cursor, limit)
+    return json_response([Comment(**comment).model_dump() for comment in comments], response)
+
+# Task history endpoints
+@api_router.get("/tasks/{task_id}/history", response_model=List[TaskEvent])
+async def get_task_history(
+    task_id: str,
+    response: Response,
+    after: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_user)
+):
+    if not await db.tasks.find_one({"id": task_id}, {"_id": 0, "id": 1}):
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    events = await task_events_page({"task_id": task_id}, response, after, limit)
+    return json_response(events, response)
+
+@api_router.get("/task-events", response_model=List[TaskEvent])
+async def tail_task_events(
+    response: Response,
+    after: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_user)
+):
+    """Every task's history in write order, minus the last TASK_EVENT_SETTLE_SECONDS - poll with after set to the last event id received"""
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Only admins can read the global event log")
+    
+    settled_before = ObjectId.from_datetime(datetime.utcnow() - timedelta(seconds=TASK_EVENT_SETTLE_SECONDS))
+    events = await task_events_page({}, response, after, limit, settled_before)
+    return json_response(events, response)
+
+# Event stream endpoint
+@api_router.get("/events")
+async def stream_events(
+    request: Request,
+    last_event_id: Optional[int] = None,
+    current_user: User = Depends(get_stream_user)
+):
+    header_event_id = request.headers.get("last-event-id")
+    if header_event_id and header_event_id.isdigit():
+        last_event_id = int(header_event_id)
+    
+    subscription = event_broker.subscribe(current_user)
+    backlog = event_broker.replay(current_user, last_event_id) if last_event_id is not None else []
+    
+    async def event_stream():
+        try:
+            if backlog is None:
+                # Too far behind to replay - the client should refetch its task list
+                yield "event: reset\ndata: {}\n\n"
+            else:
+                for event in backlog:
+                    yield format_sse(event)
+            
+            replayed_id = backlog[-1]["id"] if backlog else (last_event_id or 0)
+            while not subscription.overflowed:
+                try:
+                    event = await queue_get(subscription.queue, EVENT_STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                if event["id"] > replayed_id:
+                    yield format_sse(event)
+        finally:
+            event_broker.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 # Dashboard endpoints
 @api_router.get("/dashboard")
 async def get_dashboard(current_user: User = Depends(get_current_user)):
+    return await build_dashboard(current_user)
+
+async def build_dashboard(current_user: User) -> dict:
     dashboard_data = {}
     
     if current_user.role == UserRole.ADMIN:
         # Admin dashboard
-        total_workflows = await db.workflows.count_documents({})
-        total_tasks = await db.tasks.count_documents({})
-        pending_tasks = await db.tasks.count_documents({"status": TaskStatus.SUBMITTED})
+        counter = await db.task_counters.find_one({"_id": GLOBAL_COUNTER_ID}) or {}
+        status_counts = counter_status_counts(counter)
         
         dashboard_data = {
-            "total_workflows": total_workflows,
-            "total_tasks": total_tasks,
-            "pending_approvals": pending_tasks,
+            "total_workflows": counter.get("workflows", 0),
+            "total_tasks": sum(status_counts.values()),
+            "pending_approvals": status_counts[TaskStatus.SUBMITTED.value],
+            "status_counts": status_counts,
             "role": "admin"
         }
         
     elif current_user.role == UserRole.ASSIGNEE:
         # Assignee dashboard
-        my_tasks = await db.tasks.count_documents({"assignee_id": current_user.id})
-        completed_tasks = await db.tasks.count_documents({
-            "assignee_id": current_user.id,
-            "status": {"$in": [TaskStatus.APPROVED, TaskStatus.REJECTED]}
-        })
-        pending_tasks = await db.tasks.count_documents({
-            "assignee_id": current_user.id,
-            "status": {"$in": [TaskStatus.NOT_STARTED, TaskStatus.IN_PROGRESS]}
-        })
+        counter = await db.task_counters.find_one({"_id": f"assignee:{current_user.id}"})
+        status_counts = counter_status_counts(counter)
         
         dashboard_data = {
-            "my_tasks": my_tasks,
-            "completed_tasks": completed_tasks,
-            "pending_tasks": pending_tasks,
+            "my_tasks": sum(status_counts.values()),
+            "completed_tasks": status_counts[TaskStatus.APPROVED.value] + status_counts[TaskStatus.REJECTED.value],
+            "pending_tasks": status_counts[TaskStatus.NOT_STARTED.value] + status_counts[TaskStatus.IN_PROGRESS.value],
+            "status_counts": status_counts,
             "role": "assignee"
         }
         
     elif current_user.role == UserRole.APPROVER:
         # Approver dashboard
-        pending_approvals = await db.tasks.count_documents({
-            "approver_id": current_user.id,
-            "status": TaskStatus.SUBMITTED
-        })
-        approved_tasks = await db.tasks.count_documents({
-            "approver_id": current_user.id,
-            "status": TaskStatus.APPROVED
-        })
-        rejected_tasks = await db.tasks.count_documents({
-            "approver_id": current_user.id,
-            "status": TaskStatus.REJECTED
-        })
+        counter = await db.task_counters.find_one({"_id": f"approver:{current_user.id}"})
+        status_counts = counter_status_counts(counter)
         
         dashboard_data = {
-            "pending_approvals": pending_approvals,
-            "approved_tasks": approved_tasks,
-            "rejected_tasks": rejected_tasks,
+            "pending_approvals": status_counts[TaskStatus.SUBMITTED.value],
+            "approved_tasks": status_counts[TaskStatus.APPROVED.value],
+            "rejected_tasks": status_counts[TaskStatus.REJECTED.value],
+            "status_counts": status_counts,
             "role": "approver"
         }
     
     return dashboard_data
 
+# Bootstrap endpoint - everything the dashboard needs for first paint in one request
+@api_router.get("/bootstrap")
+async def get_bootstrap(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    view: ListView = ListView.FULL,
+    current_user: User = Depends(get_current_user)
+):
+    # Each list pages independently, so each gets its own response to carry its cursor
+    workflows_response, tasks_response = Response(), Response()
+    projection, model = task_projection(view, None)
+    
+    dashboard, workflows, tasks = await asyncio.gather(
+        build_dashboard(current_user),
+        list_user_workflows(current_user, workflows_response, limit=limit),
+        list_user_tasks(current_user, tasks_response, limit=limit, projection=projection)
+    )
+    
+    return json_response({
+        "dashboard": dashboard,
+        "workflows": [Workflow(**workflow).model_dump() for workflow in workflows],
+        "tasks": serialize_tasks(tasks, model),
+        "next_cursors": {
+            "workflows": workflows_response.headers.get(NEXT_CURSOR_HEADER),
+            "tasks": tasks_response.headers.get(NEXT_CURSOR_HEADER)
+        }
+    }, response)
+
 # Users endpoint for admin
-@api_router.get("/users", response_model=List[User])
-async def get_users(current_user: User = Depends(get_current_user)):
+@api_router.get("/users", response_model=List[UserPublic])
+async def get_users(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_user)
+):
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Only admins can view users")
     
-    users = await db.users.find().to_list(100)
-    return [User(**user) for user in users]
+    users = await paginate(db.users, {}, response, cursor, limit, projection={"_id": 0, "password_hash": 0})
+    return json_response([UserPublic(**user).model_dump() for user in users], response)
+
+# Metrics endpoint for admin
+@api_router.get("/metrics")
+async def get_metrics(current_user: User = Depends(get_current_user)):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Only admins can view metrics")
+    
+    return {
+        "principal_cache": principal_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "transition_outbox": await transition_worker.stats(),
+        "transition_graph_cache": transition_graph_cache.stats(),
+        "notifications": notification_dispatcher.stats(),
+        "event_stream": event_broker.stats(),
+        "deadline_scheduler": deadline_scheduler.stats()
+    }
 
 # Include the router in the main app
 app.include_router(api_router)
@@ -559,6 +2736,7 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 # Configure logging
@@ -568,6 +2746,73 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def create_db_indexes():
+    await ensure_indexes()
+    await transactions.detect()
+    
+    # First boot against existing data - seed the dashboard counters once
+    if not await db.task_counters.find_one({"_id": GLOBAL_COUNTER_ID}):
+        await rebuild_task_counters()
+        await rebuild_comment_counts()
+    
+    notification_dispatcher.start()
+    event_broker.start()
+    if OUTBOX_WORKER_ENABLED:
+        transition_worker.start()
+    if DEADLINE_SCHEDULER_ENABLED:
+        deadline_scheduler.start()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    await transition_worker.stop()
+    await deadline_scheduler.stop()
+    await event_broker.stop()
+    await notification_dispatcher.stop()
+    password_hasher.shutdown()
+    client.close()
+
+# Maintenance commands, e.g. `python server.py check-indexes`
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Workflow backend maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("ensure-indexes", help="Create all indexes in the index manifest")
+    subparsers.add_parser("check-indexes", help="Report missing, unknown and unused indexes")
+    subparsers.add_parser("rebuild-counters", help="Recompute dashboard counters and task comment counts")
+    subparsers.add_parser("outbox-worker", help="Run the transition outbox worker without the API")
+    args = parser.parse_args(argv)
+    
+    if args.command == "ensure-indexes":
+        asyncio.run(ensure_indexes())
+        return 0
+    
+    if args.command == "check-indexes":
+        report = asyncio.run(check_indexes())
+        print(json.dumps(report, indent=2))
+        return 1 if any(entry["missing"] for entry in report.values()) else 0
+    
+    if args.command == "rebuild-counters":
+        async def rebuild():
+            return await rebuild_task_counters(), await rebuild_comment_counts()
+        rebuilt, commented = asyncio.run(rebuild())
+        print(f"Rebuilt {rebuilt} counter documents and comment counts for {commented} tasks")
+        return 0
+    
+    if args.command == "outbox-worker":
+        async def run_worker():
+            notification_dispatcher.start()
+            try:
+                await transition_worker.run()
+            finally:
+                await notification_dispatcher.stop()
+        
+        try:
+            asyncio.run(run_worker())
+        except KeyboardInterrupt:
+            pass
+        return 0
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
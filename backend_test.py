@@ -287,6 +287,98 @@ if workflow_id:
         print(f"Task transitions defined (will be tested in approval flow):")
         print(json.dumps(task1_transitions, indent=2))
 
+# Import a whole workflow in one request - transitions reference tasks by local ref
+imported_task_ids = {}
+if "admin" in tokens:
+    def import_task(ref, transitions=()):
+        return {
+            "ref": ref,
+            "title": f"Imported {ref} {test_id}",
+            "description": "Created by a workflow import",
+            "assignee_id": user_ids.get("assignee"),
+            "approver_id": user_ids.get("approver"),
+            "transitions": [
+                {"transition_type": transition_type, "target_refs": target_refs}
+                for transition_type, target_refs in transitions
+            ]
+        }
+    
+    def post_import(name, import_tasks):
+        headers = {"Authorization": f"Bearer {tokens['admin']}"}
+        return requests.post(f"{API_URL}/workflows/import", headers=headers,
+                             json={"name": name, "description": "Imported workflow", "tasks": import_tasks})
+    
+    try:
+        response = post_import(f"Imported Workflow {test_id}", [
+            import_task("draft", [("approved", ["review"])]),
+            import_task("review")
+        ])
+        if response.status_code == 200:
+            imported = response.json()
+            # Tasks come back in import order
+            imported_task_ids = dict(zip(["draft", "review"], [task["id"] for task in imported["tasks"]]))
+            draft = imported["tasks"][0]
+            if draft["transitions"][0]["target_task_ids"] == [imported_task_ids.get("review")]:
+                log_test("Workflow Management", "Import workflow with refs", True)
+            else:
+                log_test("Workflow Management", "Import workflow with refs", False,
+                        f"Refs not resolved: {draft['transitions']}")
+        else:
+            log_test("Workflow Management", "Import workflow with refs", False,
+                    f"Status: {response.status_code}, Response: {response.text}")
+    except Exception as e:
+        log_test("Workflow Management", "Import workflow with refs", False, str(e))
+    
+    invalid_imports = [
+        ("Import rejects duplicate refs", [import_task("a"), import_task("a")]),
+        ("Import rejects unknown refs", [import_task("a", [("approved", ["missing"])])]),
+        ("Import rejects cyclic transitions", [import_task("a", [("approved", ["b"])]), import_task("b", [("approved", ["a"])])])
+    ]
+    for test_name, import_tasks in invalid_imports:
+        try:
+            response = post_import(f"Invalid Import {test_id}", import_tasks)
+            log_test("Workflow Management", test_name, response.status_code == 400,
+                     f"Status: {response.status_code}, Response: {response.text}")
+        except Exception as e:
+            log_test("Workflow Management", test_name, False, str(e))
+
+# Updating transitions must not close a cycle either
+if imported_task_ids.get("draft") and imported_task_ids.get("review"):
+    try:
+        headers = {"Authorization": f"Bearer {tokens['admin']}"}
+        response = requests.put(f"{API_URL}/tasks/{imported_task_ids['review']}", headers=headers, json=[
+            {"transition_type": "approved", "target_task_ids": [imported_task_ids["draft"]], "is_automatic": True}
+        ])
+        log_test("Workflow Management", "Cyclic transition update rejected", response.status_code == 400,
+                 f"Status: {response.status_code}, Response: {response.text}")
+    except Exception as e:
+        log_test("Workflow Management", "Cyclic transition update rejected", False, str(e))
+
+# Batch create - every item gets its own result
+if workflow_id:
+    try:
+        headers = {"Authorization": f"Bearer {tokens['admin']}"}
+        batch_tasks = [
+            {
+                "title": f"Batch Task {index} {test_id}",
+                "description": "Created in a batch",
+                "assignee_id": user_ids["assignee"],
+                "approver_id": user_ids["approver"],
+                "transitions": []
+            }
+            for index in range(3)
+        ]
+        response = requests.post(f"{API_URL}/workflows/{workflow_id}/tasks:batch", headers=headers, json=batch_tasks)
+        result = response.json() if response.status_code == 200 else None
+        if result and result["succeeded"] == 3 and [item["index"] for item in result["results"]] == [0, 1, 2] \
+                and all(item["status_code"] == 200 and item["id"] for item in result["results"]):
+            log_test("Workflow Management", "Batch create tasks", True)
+        else:
+            log_test("Workflow Management", "Batch create tasks", False,
+                    f"Status: {response.status_code}, Response: {response.text}")
+    except Exception as e:
+        log_test("Workflow Management", "Batch create tasks", False, str(e))
+
 # 3. Test Task Submission System
 print("\n=== Testing Task Submission System ===\n")
 
@@ -359,11 +451,54 @@ def test_get_task_submissions(task_id, role):
         log_test("Task Submission System", f"Get task submissions as {role}", False, str(e))
         return None
 
+def test_paginate_user_tasks(role, page_size=1):
+    try:
+        headers = {"Authorization": f"Bearer {tokens[role]}"}
+        seen_ids = []
+        cursor = None
+        while True:
+            params = {"limit": page_size}
+            if cursor:
+                params["cursor"] = cursor
+            response = requests.get(f"{API_URL}/tasks", headers=headers, params=params)
+            if response.status_code != 200:
+                log_test("Task Submission System", f"Paginate tasks as {role}", False,
+                        f"Status: {response.status_code}, Response: {response.text}")
+                return None
+            page = response.json()
+            if len(page) > page_size:
+                log_test("Task Submission System", f"Paginate tasks as {role}", False,
+                        f"Page size {len(page)} exceeds limit {page_size}")
+                return None
+            seen_ids.extend(task["id"] for task in page)
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        if len(seen_ids) == len(set(seen_ids)):
+            log_test("Task Submission System", f"Paginate tasks as {role}", True)
+            return seen_ids
+        else:
+            log_test("Task Submission System", f"Paginate tasks as {role}", False, "Duplicate tasks across pages")
+            return None
+    except Exception as e:
+        log_test("Task Submission System", f"Paginate tasks as {role}", False, str(e))
+        return None
+
 # Get tasks for each role
 admin_tasks = test_get_user_tasks("admin")
 approver_tasks = test_get_user_tasks("approver")
 assignee_tasks = test_get_user_tasks("assignee")
 
+# Walk the assignee's task list page by page
+paginated_task_ids = test_paginate_user_tasks("assignee")
+if paginated_task_ids is not None and assignee_tasks is not None:
+    if len(paginated_task_ids) == len(assignee_tasks):
+        log_test("Task Submission System", "Paginated tasks match full listing", True)
+    else:
+        log_test("Task Submission System", "Paginated tasks match full listing", False,
+                f"Expected {len(assignee_tasks)} tasks, got {len(paginated_task_ids)}")
+
 # Get specific task
 if task1_id:
     task = test_get_task_by_id(task1_id, "assignee")
@@ -374,6 +509,50 @@ if task1_id:
     # Get task submissions
     if submission:
         submissions = test_get_task_submissions(task1_id, "approver")
+        
+        # Listings carry metadata only, the content is streamed separately
+        try:
+            headers = {"Authorization": f"Bearer {tokens['approver']}"}
+            response = requests.get(f"{API_URL}/tasks/{task1_id}/submissions/{submission['id']}/content", headers=headers)
+            expected = f"Task submission for task {task1_id}. Completed all requirements."
+            if response.status_code == 200 and response.text == expected and submission["size"] == len(expected):
+                log_test("Task Submission System", "Download submission content", True)
+            else:
+                log_test("Task Submission System", "Download submission content", False,
+                        f"Status: {response.status_code}, Response: {response.text}")
+        except Exception as e:
+            log_test("Task Submission System", "Download submission content", False, str(e))
+
+        # An upload to a task that is already submitted is refused before its body is stored
+        try:
+            headers = {"Authorization": f"Bearer {tokens['assignee']}", "Content-Type": "application/octet-stream"}
+            response = requests.post(f"{API_URL}/tasks/{task1_id}/submit/upload", headers=headers, data=b"x" * 4096)
+            after = test_get_task_submissions(task1_id, "approver")
+            if response.status_code == 409 and after is not None and len(after) == len(submissions or []):
+                log_test("Task Submission System", "Upload to submitted task conflicts", True)
+            else:
+                log_test("Task Submission System", "Upload to submitted task conflicts", False,
+                        f"Status: {response.status_code}, Response: {response.text}")
+        except Exception as e:
+            log_test("Task Submission System", "Upload to submitted task conflicts", False, str(e))
+
+# Batch status update - duplicates and unknown tasks fail on their own without failing the batch
+if imported_task_ids.get("review"):
+    try:
+        headers = {"Authorization": f"Bearer {tokens['assignee']}"}
+        response = requests.put(f"{API_URL}/tasks/status:batch", headers=headers, json=[
+            {"task_id": imported_task_ids["review"], "status": "in_progress"},
+            {"task_id": imported_task_ids["review"], "status": "submitted"},
+            {"task_id": str(uuid.uuid4()), "status": "in_progress"}
+        ])
+        codes = [item["status_code"] for item in response.json()["results"]] if response.status_code == 200 else None
+        if codes == [200, 400, 404]:
+            log_test("Task Submission System", "Batch status update", True)
+        else:
+            log_test("Task Submission System", "Batch status update", False,
+                    f"Status: {response.status_code}, Response: {response.text}")
+    except Exception as e:
+        log_test("Task Submission System", "Batch status update", False, str(e))
 
 # 4. Test Task Approval and Multi-Task Transition Engine
 print("\n=== Testing Task Approval and Multi-Task Transition Engine ===\n")
@@ -448,6 +627,29 @@ if task1_id:
     # Check if task1 status is updated to "approved"
     test_check_task_status(task1_id, "approved")
     
+    # A second decision on the same submission must conflict instead of re-firing transitions
+    try:
+        headers = {"Authorization": f"Bearer {tokens['approver']}"}
+        response = requests.post(f"{API_URL}/tasks/{task1_id}/approve", headers=headers,
+                                 json={"decision": "rejected", "comments": "Late decision."})
+        log_test("Multi-Task Transition Engine", "Repeated approval conflicts", response.status_code == 409,
+                 f"Status: {response.status_code}, Response: {response.text}")
+    except Exception as e:
+        log_test("Multi-Task Transition Engine", "Repeated approval conflicts", False, str(e))
+    
+    # Every status change is kept in the task's history, oldest first
+    try:
+        headers = {"Authorization": f"Bearer {tokens['admin']}"}
+        response = requests.get(f"{API_URL}/tasks/{task1_id}/history", headers=headers)
+        sources = [event["source"] for event in response.json()] if response.status_code == 200 else None
+        if sources and sources[0] == "create" and sources[-2:] == ["submit", "approval"]:
+            log_test("Multi-Task Transition Engine", "Task history", True)
+        else:
+            log_test("Multi-Task Transition Engine", "Task history", False,
+                    f"Status: {response.status_code}, Sources: {sources}")
+    except Exception as e:
+        log_test("Multi-Task Transition Engine", "Task history", False, str(e))
+    
     # Check if task2 (approved path) is triggered
     time.sleep(1)  # Give a moment for the transition to occur
     test_check_transition_triggered(task2_id)
@@ -527,6 +729,54 @@ if assignee_dashboard:
     else:
         log_test("Dashboard Analytics", "Assignee dashboard structure", False, "Missing or incorrect role field")
 
+# Verify every dashboard carries a per-status breakdown
+for role, dashboard in (("admin", admin_dashboard), ("approver", approver_dashboard), ("assignee", assignee_dashboard)):
+    if dashboard:
+        status_counts = dashboard.get("status_counts", {})
+        expected_statuses = {"not_started", "in_progress", "submitted", "approved", "rejected"}
+        if set(status_counts.keys()) == expected_statuses:
+            log_test("Dashboard Analytics", f"{role.capitalize()} dashboard status breakdown", True)
+        else:
+            log_test("Dashboard Analytics", f"{role.capitalize()} dashboard status breakdown", False,
+                    f"Unexpected status_counts: {status_counts}")
+
+# Overdue tasks - open tasks past their deadline, most overdue first
+try:
+    headers = {"Authorization": f"Bearer {tokens['admin']}"}
+    response = requests.get(f"{API_URL}/tasks/overdue", headers=headers)
+    if response.status_code == 200:
+        deadlines = [task["deadline"] for task in response.json()]
+        now = datetime.utcnow().isoformat()
+        passed = deadlines == sorted(deadlines) and all(deadline < now for deadline in deadlines)
+        log_test("Dashboard Analytics", "Overdue tasks", passed, f"Deadlines: {deadlines}")
+    else:
+        log_test("Dashboard Analytics", "Overdue tasks", False, f"Status: {response.status_code}, Response: {response.text}")
+except Exception as e:
+    log_test("Dashboard Analytics", "Overdue tasks", False, str(e))
+
+# Bootstrap - dashboard and the first page of each list in one request
+try:
+    headers = {"Authorization": f"Bearer {tokens['admin']}"}
+    response = requests.get(f"{API_URL}/bootstrap", headers=headers, params={"limit": 1})
+    if response.status_code == 200:
+        bootstrap = response.json()
+        cursors = bootstrap.get("next_cursors", {})
+        passed = set(bootstrap.keys()) == {"dashboard", "workflows", "tasks", "next_cursors"} \
+            and len(bootstrap["workflows"]) == 1 and len(bootstrap["tasks"]) == 1 \
+            and cursors.get("workflows") and cursors.get("tasks")
+        log_test("Dashboard Analytics", "Bootstrap payload", bool(passed), f"Keys: {list(bootstrap.keys())}, Cursors: {cursors}")
+        
+        # The task cursor continues the same listing as GET /tasks
+        if cursors.get("tasks"):
+            response = requests.get(f"{API_URL}/tasks", headers=headers, params={"limit": 1, "cursor": cursors["tasks"]})
+            next_ids = [task["id"] for task in response.json()] if response.status_code == 200 else None
+            passed = bool(next_ids) and next_ids[0] != bootstrap["tasks"][0]["id"]
+            log_test("Dashboard Analytics", "Bootstrap task cursor", passed, f"Status: {response.status_code}, Ids: {next_ids}")
+    else:
+        log_test("Dashboard Analytics", "Bootstrap payload", False, f"Status: {response.status_code}, Response: {response.text}")
+except Exception as e:
+    log_test("Dashboard Analytics", "Bootstrap payload", False, str(e))
+
 # 6. Test Comments System
 print("\n=== Testing Comments System ===\n")
 
@@ -580,6 +830,70 @@ if task1_id:
             log_test("Comments System", "Comments retrieval count", True)
         else:
             log_test("Comments System", "Comments retrieval count", False, f"Expected at least 3 comments, got {len(comments)}")
+    
+    # Incremental fetch - only comments after the admin's
+    if admin_comment:
+        headers = {"Authorization": f"Bearer {tokens['admin']}"}
+        response = requests.get(f"{API_URL}/tasks/{task1_id}/comments", headers=headers,
+                                params={"after_id": admin_comment["id"]})
+        newer = [comment["id"] for comment in response.json()] if response.status_code == 200 else None
+        expected = [comment["id"] for comment in (approver_comment, assignee_comment) if comment]
+        if newer == expected:
+            log_test("Comments System", "Incremental comment feed", True)
+        else:
+            log_test("Comments System", "Incremental comment feed", False, f"Expected {expected}, got {newer}")
+    
+    # Comment counts are part of the task summary
+    task = test_get_task_by_id(task1_id, "admin")
+    if task and comments is not None:
+        if task.get("comment_count") == len(comments):
+            log_test("Comments System", "Task comment count", True)
+        else:
+            log_test("Comments System", "Task comment count", False,
+                    f"Expected {len(comments)}, got {task.get('comment_count')}")
+
+    # Conditional GET - the validators from a task read answer 304 until the task or its comments change
+    def conditional_get(path, **conditions):
+        headers = {"Authorization": f"Bearer {tokens['admin']}", **conditions}
+        return requests.get(f"{API_URL}{path}", headers=headers)
+
+    try:
+        response = conditional_get(f"/tasks/{task1_id}")
+        etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+        checks = {
+            "If-None-Match": conditional_get(f"/tasks/{task1_id}", **{"If-None-Match": etag}).status_code == 304,
+            "weak If-None-Match": conditional_get(f"/tasks/{task1_id}", **{"If-None-Match": f'"other", W/{etag}'}).status_code == 304,
+            "stale If-None-Match": conditional_get(f"/tasks/{task1_id}", **{"If-None-Match": '"other"'}).status_code == 200,
+            "If-Modified-Since": conditional_get(f"/tasks/{task1_id}", **{"If-Modified-Since": last_modified}).status_code == 304,
+            # If-None-Match wins over a date that would still match
+            "If-None-Match over If-Modified-Since": conditional_get(
+                f"/tasks/{task1_id}", **{"If-None-Match": '"other"', "If-Modified-Since": last_modified}
+            ).status_code == 200,
+            "task list If-None-Match": conditional_get(
+                "/tasks", **{"If-None-Match": conditional_get("/tasks").headers.get("ETag")}
+            ).status_code == 304,
+        }
+        failed = [name for name, passed in checks.items() if not passed]
+        if etag and last_modified and not failed:
+            log_test("Comments System", "Conditional task reads", True)
+        else:
+            log_test("Comments System", "Conditional task reads", False, f"ETag: {etag}, Last-Modified: {last_modified}, failed: {failed}")
+
+        # Comments don't touch updated_at, but they must still move Last-Modified - HTTP dates have 1s resolution
+        time.sleep(1.1)
+        test_add_comment(task1_id, "admin")
+        checks = {
+            "If-None-Match": conditional_get(f"/tasks/{task1_id}", **{"If-None-Match": etag}),
+            "If-Modified-Since": conditional_get(f"/tasks/{task1_id}", **{"If-Modified-Since": last_modified}),
+        }
+        failed = {name: response.status_code for name, response in checks.items()
+                  if response.status_code != 200 or response.json().get("comment_count") != task["comment_count"] + 1}
+        if not failed and checks["If-Modified-Since"].headers.get("Last-Modified") != last_modified:
+            log_test("Comments System", "Comment invalidates conditional reads", True)
+        else:
+            log_test("Comments System", "Comment invalidates conditional reads", False, f"Failed: {failed}")
+    except Exception as e:
+        log_test("Comments System", "Conditional task reads", False, str(e))
 
 # Print summary
 print("\n=== Test Summary ===\n")
@@ -229,14 +229,10 @@ const Dashboard = () => {
   useEffect(() => {
     const fetchDashboard = async () => {
       try {
-        const [dashboardResponse, workflowsResponse, tasksResponse] = await Promise.all([
-          axios.get(`${API}/dashboard`),
-          axios.get(`${API}/workflows`),
-          axios.get(`${API}/tasks`)
-        ]);
-        setDashboardData(dashboardResponse.data);
-        setWorkflows(workflowsResponse.data);
-        setTasks(tasksResponse.data);
+        const response = await axios.get(`${API}/bootstrap`);
+        setDashboardData(response.data.dashboard);
+        setWorkflows(response.data.workflows);
+        setTasks(response.data.tasks);
       } catch (error) {
         console.error('Error fetching dashboard:', error);
       } finally {
@@ -685,47 +681,27 @@ const CreateWorkflow = () => {
 
   const handleSave = async () => {
     try {
-      // Create workflow
-      const workflowResponse = await axios.post(`${API}/workflows`, {
+      // Create the workflow, its tasks and transitions in one request;
+      // task titles serve as refs and are resolved to ids server-side
+      await axios.post(`${API}/workflows/import`, {
         name: workflowData.name,
-        description: workflowData.description
-      });
-
-      const workflowId = workflowResponse.data.id;
-
-      // Create a mapping of task titles to their IDs for transitions
-      const taskIdMap = {};
-
-      // Create tasks first
-      for (const task of tasks) {
-        const taskResponse = await axios.post(`${API}/workflows/${workflowId}/tasks`, {
+        description: workflowData.description,
+        tasks: tasks.map(task => ({
+          ref: task.title,
           title: task.title,
           description: task.description,
           assignee_id: task.assignee_id,
           approver_id: task.approver_id,
           deadline: task.deadline || null,
-          transitions: [] // We'll update these after creating all tasks
-        });
-        taskIdMap[task.title] = taskResponse.data.id;
-      }
-
-      // Now update tasks with their transitions
-      for (const task of tasks) {
-        const taskTransitions = transitions
-          .filter(t => t.sourceTask === task.title)
-          .map(t => ({
-            transition_type: t.condition.toLowerCase(),
-            target_task_ids: t.targetTasks.map(taskTitle => taskIdMap[taskTitle]).filter(Boolean),
-            is_automatic: true
-          }));
-
-        if (taskTransitions.length > 0) {
-          // Update the task with transitions
-          await axios.put(`${API}/tasks/${taskIdMap[task.title]}`, {
-            transitions: taskTransitions
-          });
-        }
-      }
+          transitions: transitions
+            .filter(t => t.sourceTask === task.title)
+            .map(t => ({
+              transition_type: t.condition.toLowerCase(),
+              target_refs: t.targetTasks,
+              is_automatic: true
+            }))
+        }))
+      });
 
       alert('Workflow saved successfully!');
       return true;
@@ -1417,7 +1393,8 @@ const Tasks = () => {
   const handleTaskSubmit = async () => {
     try {
       await axios.post(`${API}/tasks/${selectedTask.id}/submit`, {
-        content: submissionContent
+        content: submissionContent,
+        version: selectedTask.version
       });
       setShowSubmissionModal(false);
       setSubmissionContent('');
@@ -1433,7 +1410,8 @@ const Tasks = () => {
     try {
       await axios.post(`${API}/tasks/${selectedTask.id}/approve`, {
         decision: decision,
-        comments: approvalComments
+        comments: approvalComments,
+        version: selectedTask.version
       });
       setShowApprovalModal(false);
       setApprovalComments('');
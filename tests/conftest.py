@@ -0,0 +1,28 @@
+import sys
+from pathlib import Path
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import server  # noqa: E402
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """A fresh in-memory database swapped in for server.db"""
+    client = AsyncMongoMockClient()
+    database = client["tests"]
+    monkeypatch.setattr(server, "client", client)
+    monkeypatch.setattr(server, "db", database)
+    return database
+
+
+@pytest.fixture
+def notifications(monkeypatch):
+    """Notifications sent through the dispatcher, as (recipient_id, task_id) pairs"""
+    sent = []
+    monkeypatch.setattr(server.notification_dispatcher, "notify",
+                        lambda recipient_id, task_id, message: sent.append((recipient_id, task_id)))
+    return sent
@@ -0,0 +1,31 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import server
+
+
+def test_each_firing_is_sent_by_one_scheduler_only(db, notifications):
+    async def scenario():
+        deadline = server.deadline_key(datetime.utcnow() - timedelta(seconds=1))
+        task = server.Task(title="late", description="d", assignee_id="assignee", approver_id="approver",
+                           workflow_id="workflow", deadline=deadline).dict()
+        task["status"] = task["status"].value
+        await db.tasks.insert_one(task)
+        
+        # Two processes (or one before and after a restart) holding the same firing
+        schedulers = [server.DeadlineScheduler(3600, 3600) for _ in range(3)]
+        for scheduler in schedulers:
+            scheduler._push(deadline, "overdue", task["id"], deadline)
+        fired = [await scheduler.fire_due() for scheduler in schedulers]
+        
+        assert sum(fired) == 1
+        assert sum(scheduler.claimed_elsewhere for scheduler in schedulers) == 2
+        assert notifications == [("assignee", task["id"])]
+        
+        # Moving the deadline re-arms the firing
+        new_deadline = deadline - timedelta(seconds=1)
+        await db.tasks.update_one({"id": task["id"]}, {"$set": {"deadline": new_deadline}})
+        schedulers[0]._push(new_deadline, "overdue", task["id"], new_deadline)
+        assert await schedulers[0].fire_due() == 1
+    
+    asyncio.run(scenario())
@@ -0,0 +1,113 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+import server
+
+
+def make_user(user_id, role=server.UserRole.ASSIGNEE):
+    return server.User(id=user_id, email=f"{user_id}@example.com", name=user_id, password_hash="x", role=role)
+
+
+def make_task(assignee_id="assignee", **fields):
+    return server.Task(title="t", description="d", assignee_id=assignee_id, approver_id="approver",
+                       workflow_id="workflow", **fields).dict()
+
+
+async def write_change(task, source="submit"):
+    # What any process's status change leaves behind for the relay
+    await server.record_task_events([(task, "in_progress", "submitted")], source)
+
+
+def test_relay_streams_writes_from_any_process_once(db):
+    async def scenario():
+        broker = server.EventBroker(16, 100, 0.1, 5)
+        await write_change(make_task())
+        assert await broker.poll() == 0  # written before this process started listening
+        
+        admin = broker.subscribe(make_user("admin", server.UserRole.ADMIN))
+        assignee = broker.subscribe(make_user("assignee"))
+        stranger = broker.subscribe(make_user("stranger"))
+        task = make_task()
+        await write_change(task)
+        assert await broker.poll() == 1
+        assert await broker.poll() == 0
+        
+        event = admin.queue.get_nowait()
+        assert (event["task_id"], event["previous_status"], event["status"]) == (task["id"], "in_progress", "submitted")
+        assert assignee.queue.get_nowait()["event_id"] == event["event_id"]
+        assert stranger.queue.empty()
+        
+        # A writer that stamped its id earlier but committed later is still relayed, once
+        late = server.task_event_docs([(task, "submitted", "approved")], "approval", None, None)[0]
+        late["_id"] = ObjectId.from_datetime(datetime.utcnow() - timedelta(seconds=2))
+        await db.task_events.insert_one(late)
+        assert await broker.poll() == 1
+        assert await broker.poll() == 0
+        assert admin.queue.get_nowait()["id"] > event["id"]
+    
+    asyncio.run(scenario())
+
+
+def test_replay_resumes_after_last_event_id_or_resets(db):
+    async def scenario():
+        broker = server.EventBroker(16, 3, 0.1, 5)
+        await broker.poll()
+        assignee = make_user("assignee")
+        for owner in ("assignee", "other", "assignee"):
+            await write_change(make_task(owner))
+            await broker.poll()
+        
+        first, _, third = broker._history
+        assert broker.replay(assignee, first["id"]) == [third]
+        assert broker.replay(assignee, third["id"]) == []
+        # Ids from before this process started, or already pushed out of the history, cannot be replayed
+        assert broker.replay(assignee, broker.first_event_id - 1) is None
+        await write_change(make_task())
+        await broker.poll()
+        assert broker.replay(assignee, first["id"]) is None
+    
+    asyncio.run(scenario())
+
+
+def test_slow_subscriber_overflows_instead_of_blocking(db):
+    async def scenario():
+        broker = server.EventBroker(1, 100, 0.1, 5)
+        await broker.poll()
+        slow = broker.subscribe(make_user("assignee"))
+        fast = broker.subscribe(make_user("admin", server.UserRole.ADMIN))
+        
+        for _ in range(3):
+            await write_change(make_task())
+            await broker.poll()
+            fast.queue.get_nowait()
+        
+        assert slow.overflowed
+        assert broker.overflows == 1
+        assert slow.queue.qsize() == 1
+        assert not fast.overflowed
+    
+    asyncio.run(scenario())
+
+
+def test_deadline_alerts_are_relayed(db, notifications):
+    async def scenario():
+        broker = server.EventBroker(16, 100, 0.1, 5)
+        await broker.poll()
+        subscription = broker.subscribe(make_user("assignee"))
+        
+        deadline = server.deadline_key(datetime.utcnow() - timedelta(seconds=1))
+        task = make_task(deadline=deadline)
+        task["status"] = task["status"].value
+        await db.tasks.insert_one(task)
+        scheduler = server.DeadlineScheduler(3600, 3600)
+        scheduler._push(deadline, "overdue", task["id"], deadline)
+        assert await scheduler.fire_due() == 1
+        
+        assert await broker.poll() == 1
+        event = subscription.queue.get_nowait()
+        assert (event["type"], event["task_id"]) == ("task_overdue", task["id"])
+        assert event["deadline"] == deadline.isoformat()
+    
+    asyncio.run(scenario())
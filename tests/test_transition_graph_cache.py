@@ -0,0 +1,61 @@
+import asyncio
+
+import server
+
+
+async def seed(db):
+    workflow = server.Workflow(name="w", description="d", created_by="admin").dict()
+    await db.workflows.insert_one(workflow)
+    tasks = [
+        server.Task(title=title, description="d", assignee_id="assignee", approver_id="approver",
+                    workflow_id=workflow["id"]).dict()
+        for title in ("a", "b", "c")
+    ]
+    await db.tasks.insert_many(tasks)
+    return workflow["id"], [task["id"] for task in tasks]
+
+
+def test_edit_in_another_process_is_seen_on_next_lookup(db):
+    async def scenario():
+        workflow_id, (a, b, c) = await seed(db)
+        # e.g. the outbox worker process walking the graph, and an API process editing it
+        worker_cache = server.TransitionGraphCache(ttl_seconds=3600, max_workflows=10)
+        api_cache = server.TransitionGraphCache(ttl_seconds=3600, max_workflows=10)
+        
+        assert (await worker_cache.adjacency([a]))[a]["approved"] == []
+        assert (await worker_cache.adjacency([a]))[a]["approved"] == []
+        assert (worker_cache.hits, worker_cache.compiles) == (1, 1)
+        
+        await db.tasks.update_one({"id": a}, {"$set": {"transitions": [
+            server.TaskTransition(transition_type="approved", target_task_ids=[b, c]).dict()
+        ]}})
+        await api_cache.invalidate(workflow_id)
+        
+        assert (await worker_cache.adjacency([a]))[a]["approved"] == [b, c]
+        assert worker_cache.compiles == 2
+    
+    asyncio.run(scenario())
+
+
+def test_compile_racing_an_edit_is_not_trusted(db, monkeypatch):
+    async def scenario():
+        workflow_id, (a, b, _) = await seed(db)
+        cache = server.TransitionGraphCache(ttl_seconds=3600, max_workflows=10)
+        
+        # The edit lands after the compile read the version but before it read the tasks
+        versions = cache._versions
+        async def edit_after_version_read(workflow_ids):
+            result = await versions(workflow_ids)
+            if cache.compiles == 1 and not cache._graphs:
+                await db.tasks.update_one({"id": a}, {"$set": {"transitions": [
+                    server.TaskTransition(transition_type="approved", target_task_ids=[b]).dict()
+                ]}})
+                await db.workflows.update_one({"id": workflow_id}, {"$inc": {"graph_version": 1}})
+            return result
+        monkeypatch.setattr(cache, "_versions", edit_after_version_read)
+        
+        await cache.adjacency([a])
+        assert (await cache.adjacency([a]))[a]["approved"] == [b]
+        assert cache.compiles == 2
+    
+    asyncio.run(scenario())
@@ -0,0 +1,158 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+import server
+
+
+def make_task(title, transitions=(), status=server.TaskStatus.IN_PROGRESS):
+    return server.Task(
+        title=title, description="d", assignee_id="assignee", approver_id="approver", workflow_id="workflow",
+        status=status, transitions=list(transitions)
+    ).dict()
+
+
+async def seed(db, target_count=2):
+    targets = [make_task(f"target {index}") for index in range(target_count)]
+    source = make_task("source", [server.TaskTransition(
+        transition_type="approved", target_task_ids=[target["id"] for target in targets]
+    )], status=server.TaskStatus.APPROVED)
+    await db.tasks.insert_many([source] + targets)
+    await server.rebuild_task_counters()
+    return source, targets
+
+
+async def counters(db):
+    # mongomock keeps str enums as they were written, where Mongo would store their values; zeros are
+    # left behind by $inc but never written by a rebuild
+    return {
+        counter["_id"]: {getattr(status, "value", status): count for status, count in counter["status_counts"].items() if count}
+        async for counter in db.task_counters.find()
+    }
+
+
+def test_retry_after_partial_failure_records_once(db, notifications, monkeypatch):
+    async def scenario():
+        source, targets = await seed(db)
+        job_id = str(uuid.uuid4())
+        await server.enqueue_transition_job(job_id, source["id"], "approved")
+        worker = server.TransitionOutboxWorker(poll_interval=0, lease_seconds=60, max_attempts=5)
+        
+        # Fail after the task writes, before the changes are recorded
+        record_status_changes = server.record_status_changes
+        calls = []
+        async def fail_once(changes, source_name, *args, **kwargs):
+            calls.append(len(changes))
+            if len(calls) == 1:
+                raise RuntimeError("crashed before recording")
+            await record_status_changes(changes, source_name, *args, **kwargs)
+        monkeypatch.setattr(server, "record_status_changes", fail_once)
+        
+        await worker.process_job(await worker.claim_job())
+        assert worker.retried == 1
+        assert await db.tasks.count_documents({"status": server.TaskStatus.NOT_STARTED}) == len(targets)
+        
+        await worker.process_job(await worker.claim_job())
+        job = await db.transition_outbox.find_one({"id": job_id})
+        assert job["status"] == server.OutboxStatus.DONE.value
+        assert job["transitioned"] == len(targets)
+        
+        # A further rerun of the finished job changes nothing either
+        await server.trigger_task_transitions(job)
+        
+        events = await db.task_events.find({"source": "transition"}).to_list(None)
+        assert sorted(event["task_id"] for event in events) == sorted(target["id"] for target in targets)
+        assert {event["previous_status"] for event in events} == {server.TaskStatus.IN_PROGRESS.value}
+        assert sorted(task_id for _, task_id in notifications) == sorted(target["id"] for target in targets)
+        
+        recorded = await counters(db)
+        await server.rebuild_task_counters()
+        assert recorded == await counters(db)
+    
+    asyncio.run(scenario())
+
+
+def test_lease_reclaim_stops_at_max_attempts(db):
+    async def scenario():
+        source, _ = await seed(db, target_count=1)
+        job_id = str(uuid.uuid4())
+        await server.enqueue_transition_job(job_id, source["id"], "approved")
+        await db.tasks.update_one({"id": source["id"]}, {"$set": {"pending_transition": {
+            "job_id": job_id, "decision": "approved", "queued_at": datetime.utcnow()
+        }}})
+        # The worker holding the last allowed attempt died and its lease ran out
+        await db.transition_outbox.update_one({"id": job_id}, {"$set": {
+            "status": server.OutboxStatus.PROCESSING.value,
+            "attempts": 3,
+            "available_at": datetime.utcnow() - timedelta(seconds=1)
+        }})
+        worker = server.TransitionOutboxWorker(poll_interval=0, lease_seconds=60, max_attempts=3)
+        
+        assert await worker.claim_job() is None
+        assert await worker.drain() == 0
+        job = await db.transition_outbox.find_one({"id": job_id})
+        assert job["status"] == server.OutboxStatus.FAILED.value
+        assert worker.failed == 1
+        assert "pending_transition" not in await db.tasks.find_one({"id": source["id"]})
+    
+    asyncio.run(scenario())
+
+
+def test_sweep_enqueues_decision_whose_job_was_lost(db):
+    async def scenario():
+        source, _ = await seed(db, target_count=1)
+        job_id = str(uuid.uuid4())
+        await db.tasks.update_one({"id": source["id"]}, {"$set": {"pending_transition": {
+            "job_id": job_id, "decision": "approved", "queued_at": datetime.utcnow() - timedelta(seconds=120)
+        }}})
+        worker = server.TransitionOutboxWorker(poll_interval=0, lease_seconds=60, max_attempts=3)
+        
+        await worker.requeue_lost_transitions()
+        await worker.requeue_lost_transitions()
+        assert await db.transition_outbox.count_documents({"id": job_id}) == 1
+        
+        assert await worker.drain() == 1
+        assert (await db.transition_outbox.find_one({"id": job_id}))["status"] == server.OutboxStatus.DONE.value
+        assert "pending_transition" not in await db.tasks.find_one({"id": source["id"]})
+    
+    asyncio.run(scenario())
+
+
+def test_queue_get_keeps_item_delivered_during_cancel():
+    async def scenario():
+        queue = asyncio.Queue()
+        getter = asyncio.ensure_future(server.queue_get(queue, 10))
+        await asyncio.sleep(0)
+        queue.put_nowait("item")
+        getter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await getter
+        assert queue.get_nowait() == "item"
+    
+    asyncio.run(scenario())
+
+
+def test_queue_get_times_out_and_returns_items():
+    async def scenario():
+        queue = asyncio.Queue()
+        with pytest.raises(asyncio.TimeoutError):
+            await server.queue_get(queue, 0.01)
+        queue.put_nowait("item")
+        assert await server.queue_get(queue, 1) == "item"
+    
+    asyncio.run(scenario())
+
+
+def test_wait_for_wakeup_does_not_swallow_cancel():
+    async def scenario():
+        event = asyncio.Event()
+        waiter = asyncio.ensure_future(server.wait_for_wakeup(event, 10))
+        await asyncio.sleep(0)
+        event.set()
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+    
+    asyncio.run(scenario())